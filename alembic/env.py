@@ -22,6 +22,7 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from app.db.models.user import User
 from app.db.models.task import Task
+from app.db.models.notification import NotificationOutbox
 
 target_metadata = Base.metadata
 
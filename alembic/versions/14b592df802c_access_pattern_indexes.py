@@ -0,0 +1,90 @@
+"""Access pattern indexes
+
+Revision ID: 14b592df802c
+Revises: 7d1da512205b
+Create Date: 2026-10-17 09:12:31.482113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "14b592df802c"
+down_revision: Union[str, Sequence[str], None] = "7d1da512205b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Indexes are built with CREATE INDEX CONCURRENTLY, which can not run inside
+    a transaction, so they are created in an autocommit block and do not lock
+    writes on live tables.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_task_list_id_status",
+            "tasks",
+            ["task_list_id", "status"],
+            unique=False,
+            postgresql_include=["priority"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_task_list_id_id",
+            "tasks",
+            ["task_list_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_user_id_id",
+            "tasks",
+            ["user_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_status_id",
+            "tasks",
+            ["status", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_task_lists_user_id",
+            "task_lists",
+            ["user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_task_lists_user_id",
+            table_name="task_lists",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_status_id", table_name="tasks", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_tasks_user_id_id", table_name="tasks", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_tasks_task_list_id_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_task_list_id_status",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
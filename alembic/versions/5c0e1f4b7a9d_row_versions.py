@@ -0,0 +1,40 @@
+"""Row versions of tasks and task lists
+
+Revision ID: 5c0e1f4b7a9d
+Revises: 14b592df802c
+Create Date: 2026-10-17 11:40:05.209731
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0e1f4b7a9d"
+down_revision: Union[str, Sequence[str], None] = "14b592df802c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Columns with a constant default are added without rewriting the tables.
+    """
+    op.add_column(
+        "tasks",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.add_column(
+        "task_lists",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("task_lists", "version")
+    op.drop_column("tasks", "version")
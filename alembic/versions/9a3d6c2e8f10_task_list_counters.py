@@ -0,0 +1,49 @@
+"""Task counters of task lists
+
+Revision ID: 9a3d6c2e8f10
+Revises: 5c0e1f4b7a9d
+Create Date: 2026-10-17 13:05:48.771204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a3d6c2e8f10"
+down_revision: Union[str, Sequence[str], None] = "5c0e1f4b7a9d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The counters are backfilled with one grouped count of the tasks, drift
+    after the migration is repaired by python -m app.cli.reconcile_counters.
+    """
+    op.add_column(
+        "task_lists",
+        sa.Column("total_tasks", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "task_lists",
+        sa.Column("completed_tasks", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        "UPDATE task_lists SET total_tasks = counts.total, "
+        "completed_tasks = counts.completed "
+        "FROM (SELECT task_list_id, count(*) AS total, "
+        "count(*) FILTER (WHERE status = 'COMPLETED') AS completed "
+        "FROM tasks GROUP BY task_list_id) AS counts "
+        "WHERE task_lists.id = counts.task_list_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("task_lists", "completed_tasks")
+    op.drop_column("task_lists", "total_tasks")
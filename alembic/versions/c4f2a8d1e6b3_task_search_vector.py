@@ -0,0 +1,56 @@
+"""Full text search vector of tasks
+
+Revision ID: c4f2a8d1e6b3
+Revises: 9a3d6c2e8f10
+Create Date: 2026-10-17 15:21:37.640128
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f2a8d1e6b3"
+down_revision: Union[str, Sequence[str], None] = "9a3d6c2e8f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Adding a stored generated column rewrites the tasks table under an ACCESS
+    EXCLUSIVE lock, run it in a maintenance window on big tables. The GIN
+    index is then built concurrently.
+    """
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('simple', coalesce(description, ''))", persisted=True
+            ),
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_search_vector", table_name="tasks", postgresql_concurrently=True
+        )
+    op.drop_column("tasks", "search_vector")
@@ -0,0 +1,83 @@
+"""Notification outbox
+
+Revision ID: e7b1d94c3a25
+Revises: c4f2a8d1e6b3
+Create Date: 2026-10-17 17:02:11.935470
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b1d94c3a25"
+down_revision: Union[str, Sequence[str], None] = "c4f2a8d1e6b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+notification_status_enum = postgresql.ENUM(
+    "PENDING", "SENT", "FAILED", name="notification_status_enum"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("dedup_key", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "status",
+            notification_status_enum,
+            server_default="PENDING",
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_outbox_dedup_key_pending",
+        "notification_outbox",
+        ["dedup_key"],
+        unique=True,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_notification_outbox_available_at_pending",
+        "notification_outbox",
+        ["available_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_notification_outbox_available_at_pending",
+        table_name="notification_outbox",
+    )
+    op.drop_index(
+        "ix_notification_outbox_dedup_key_pending", table_name="notification_outbox"
+    )
+    op.drop_table("notification_outbox")
+    notification_status_enum.drop(op.get_bind())
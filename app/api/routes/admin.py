@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from app.core.enums.general_enums import SlowQueryOrder
+from app.db.slow_queries import slow_query_log
+from app.schemas.admin import SlowQueryStats
+from app.schemas.user import UserRead
+from app.services.jwt import get_current_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries", response_model=list[SlowQueryStats])
+async def list_slow_queries(
+    limit: int = Query(10, ge=1, le=100, description="Number of fingerprints"),
+    order: SlowQueryOrder = Query(SlowQueryOrder.MAX),
+    current_user: UserRead = Depends(get_current_admin),
+) -> list[SlowQueryStats]:
+    """List the slowest statement fingerprints of the slow query log.
+
+    Only the entries kept in memory by this process are aggregated.
+
+    Args:
+        limit (int, optional): Number of fingerprints. Defaults to 10.
+        order (SlowQueryOrder, optional): Sort by max, mean or total duration.
+        Defaults to Query(SlowQueryOrder.MAX).
+        current_user (UserRead, optional): Admin user from request in JWT.
+
+    Returns:
+        list[SlowQueryStats]: Slowest fingerprints with their latest plan.
+    """
+    return slow_query_log.top(limit, order)
@@ -3,47 +3,60 @@ from app.services.auth import login_user, register_user
 from app.schemas.user import UserCreate, UserRead
 from app.schemas.auth import Login
 from app.schemas.token import Token
-from app.db.session import get_db
-from sqlalchemy.orm import Session
-from app.exceptions import InvalidCredentials, EmailAlreadyExists
+from app.db.session import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.exceptions import InvalidCredentials, EmailAlreadyExists, PasswordHashingBusy
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=Token)
-def login(data: Login, db: Session = Depends(get_db)) -> Token:
+async def login(data: Login, db: AsyncSession = Depends(get_async_db)) -> Token:
     """Login in system with credentials
 
     Args:
         data (Login): Login Schema
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
 
     Raises:
-        HTTPException: If credentials was invalid
+        HTTPException: If credentials was invalid or the password hashing queue
+        is full.
 
     Returns:
         Token: User JWT
     """
     try:
-        user_token = login_user(db, data)
+        user_token = await login_user(db, data)
     except InvalidCredentials as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHashingBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     return user_token
 
 
 @router.post("/register", response_model=UserRead)
-def register(data: UserCreate, db: Session = Depends(get_db)) -> UserRead:
+async def register(
+    data: UserCreate, db: AsyncSession = Depends(get_async_db)
+) -> UserRead:
     """Register new user.
 
     Args:
         data (UserCreate): Data from new user.
-        db (Session, optional): Database Session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database Session.
+        Defaults to Depends(get_async_db).
 
     Returns:
         UserRead: User read data.
     """
     try:
-        user = register_user(db, data)
+        user = await register_user(db, data)
     except EmailAlreadyExists as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHashingBusy as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     return user
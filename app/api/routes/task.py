@@ -1,7 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from typing import Awaitable, Callable, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db, get_read_db, get_read_sessions
 from app.services.task import TaskService, TaskListService
+from app.services.task_import import TaskImportService
 from app.schemas.task import (
     TaskCreate,
     TaskUpdate,
@@ -12,192 +23,454 @@ from app.schemas.task import (
     TaskInChargeUpdate,
     TaskListWithTasks,
     TaskListFilter,
+    TaskFilter,
+    TaskBulkCreate,
+    TaskBulkSelection,
+    TaskBulkStatusUpdate,
+    TaskBulkInChargeUpdate,
+    TaskBulkResult,
+    TaskBulkDeleteResult,
+    TaskImportResult,
+    TASK_READ_LIST,
+    TASK_LIST_READ,
+    TASK_LIST_READ_LIST,
 )
 from app.services.jwt import get_current_user
-from app.db.models.user import User
-from app.exceptions import TaskDoesNotExists
+from app.schemas.user import UserRead
+from app.exceptions import TaskDoesNotExists, TaskListDoesNotExists, InvalidCursor
+from app.core.enums.general_enums import ExportFormat
+from app.core.etag import etag_matches
+from app.core.responses import json_response
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
 
 @router.post(
     "/",
 )  # response_model=TaskRead)
-def create_task(
+async def create_task(
     data: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskRead:
     """Create task.
 
     Args:
         data (TaskCreate): Task data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
         TaskRead: Data from created task.
     """
     service = TaskService(db)
     data.user_id = current_user.id
-    task = service.create_task(data)
+    task = await service.create_task(data)
     return task
 
 
 @router.get("/", response_model=list[TaskRead])
-def list_all_tasks(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-) -> list[TaskRead]:
-    """List all task.
+async def list_all_tasks(
+    filters: TaskFilter = Depends(),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    after: Optional[str] = Query(
+        None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> Response:
+    """List tasks page by page, ordered by id.
+
+    The cursor to the next page is returned in the X-Next-Cursor header,
+    it is absent in the last page.
+
+    Args:
+        filters (TaskFilter, optional): Optional filters.
+        limit (int, optional): Page size.
+        after (Optional[str], optional): Cursor from the previous page.
+        db (AsyncSession, optional): Read database session.
+        Defaults to Depends(get_read_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        Response: Page of tasks as JSON list of TaskRead.
+    """
+    service = TaskService(db)
+    try:
+        tasks, next_cursor = await service.list_tasks(filters, limit, after)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(TASK_READ_LIST, tasks, headers)
+
+
+@router.get("/search", response_model=list[TaskRead])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    filters: TaskFilter = Depends(),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    after: Optional[str] = Query(
+        None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> Response:
+    """Search tasks by description, page by page, most relevant first.
+
+    Every word of q must match the start of a word of the description. The
+    cursor to the next page is returned in the X-Next-Cursor header.
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        q (str): Search text.
+        filters (TaskFilter, optional): Optional filters.
+        limit (int, optional): Page size.
+        after (Optional[str], optional): Cursor from the previous page.
+        db (AsyncSession, optional): Read database session.
+        Defaults to Depends(get_read_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
-        list[TaskRead]: List of all task.
+        Response: Page of tasks as JSON list of TaskRead.
     """
     service = TaskService(db)
-    return service.list_all_tasks()
+    try:
+        tasks, next_cursor = await service.search_tasks(q, filters, limit, after)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(TASK_READ_LIST, tasks, headers)
 
 
 @router.get("/task-list", response_model=list[TaskListRead])
-def list_all_task_lists(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-) -> list[TaskListRead]:
+async def list_all_task_lists(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> Response:
     """
     Retrieve all task lists for the authenticated user.
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): Authenticated user from JWT.
+        db (AsyncSession, optional): Read database session.
+        Defaults to Depends(get_read_db).
+        current_user (UserRead, optional): Authenticated user from JWT.
 
     Returns:
-        list[TaskListRead]: List of all task lists.
+        Response: All task lists as JSON list of TaskListRead.
     """
-    print("entro")
     service = TaskListService(db)
-    return service.list_all_task_lists()
+    task_lists = await service.list_all_task_lists()
+    return json_response(TASK_LIST_READ_LIST, task_lists)
+
+
+@router.get("/export")
+async def export_tasks(
+    filters: TaskFilter = Depends(),
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    read_session: Callable[[], Awaitable[AsyncSession]] = Depends(get_read_sessions),
+    current_user: UserRead = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export the filtered tasks (per user, per list or all) as NDJSON or CSV.
+
+    The body is streamed while the tasks are read with a server side cursor,
+    so memory does not depend on the number of exported tasks.
+
+    Args:
+        filters (TaskFilter, optional): Optional filters.
+        format (ExportFormat, optional): ndjson or csv.
+        Defaults to Query(ExportFormat.NDJSON).
+        read_session (Callable[[], Awaitable[AsyncSession]], optional): Opens
+        the read session of the body. Defaults to Depends(get_read_sessions).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        StreamingResponse: Exported tasks.
+    """
+
+    async def chunks():
+        async with await read_session() as db:
+            async for chunk in TaskService(db).export_tasks(filters, format):
+                yield chunk
+
+    return StreamingResponse(
+        chunks(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'},
+    )
+
+
+@router.post("/bulk", response_model=TaskBulkResult)
+async def create_tasks(
+    data: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> TaskBulkResult:
+    """Create many tasks in one transaction.
+
+    Args:
+        data (TaskBulkCreate): Tasks data.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        TaskBulkResult: Created tasks.
+    """
+    service = TaskService(db)
+    for task in data.tasks:
+        task.user_id = current_user.id
+    return await service.create_tasks(data)
+
+
+@router.patch("/bulk/status", response_model=TaskBulkResult)
+async def bulk_update_status_tasks(
+    data: TaskBulkStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> TaskBulkResult:
+    """Update status for many tasks selected by ids or filters.
+
+    Args:
+        data (TaskBulkStatusUpdate): Selected tasks and status to update.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        TaskBulkResult: Updated tasks and requested ids that do not exist.
+    """
+    service = TaskService(db)
+    return await service.bulk_update_status(data)
+
+
+@router.patch("/bulk/in-charge", response_model=TaskBulkResult)
+async def bulk_update_in_charge_tasks(
+    data: TaskBulkInChargeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> TaskBulkResult:
+    """Update user in charge for many tasks selected by ids or filters.
+
+    Args:
+        data (TaskBulkInChargeUpdate): Selected tasks and user in charge.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        TaskBulkResult: Updated tasks and requested ids that do not exist.
+    """
+    service = TaskService(db)
+    return await service.bulk_update_in_charge(data)
+
+
+@router.post("/bulk/delete", response_model=TaskBulkDeleteResult)
+async def bulk_delete_tasks(
+    data: TaskBulkSelection,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> TaskBulkDeleteResult:
+    """Delete many tasks selected by ids or filters.
+
+    Args:
+        data (TaskBulkSelection): Selected tasks.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        TaskBulkDeleteResult: Deleted ids and requested ids that do not exist.
+    """
+    service = TaskService(db)
+    return await service.bulk_delete(data)
+
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.CSV),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> TaskImportResult:
+    """Import tasks from a CSV or NDJSON request body.
+
+    The body is read as a stream and loaded with COPY in batches, the columns
+    are those of the exports. Rows without user_id are put in charge of the
+    current user, rejected rows are reported with their line.
+
+    Args:
+        request (Request): Request with the file as body.
+        format (ExportFormat, optional): csv or ndjson.
+        Defaults to Query(ExportFormat.CSV).
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Returns:
+        TaskImportResult: Imported tasks and rejected rows.
+    """
+    service = TaskImportService(db)
+    return await service.import_tasks(request.stream(), format, current_user.id)
 
 
 @router.get("/{task_id}", response_model=TaskRead)
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskRead:
     """Get specific task with id.
 
+    The task ETag is returned in the ETag header, when If-None-Match matches
+    it 304 Not Modified is answered without loading the task.
+
     Args:
         task_id (int): Task id.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        response (Response): Response to set the ETag header.
+        if_none_match (Optional[str], optional): ETags of the client copies.
+        Defaults to Header(None).
+        db (AsyncSession, optional): Read database session.
+        Defaults to Depends(get_read_db).
+        current_user (UserRead, optional): User from request in JWT.
+
+    Raises:
+        HTTPException: If the task does not exists.
 
     Returns:
         TaskRead: Data from task.
     """
     service = TaskService(db)
-    return service.get_task(task_id)
+    try:
+        etag = await service.get_task_etag(task_id)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        task = await service.get_task(task_id)
+    except TaskDoesNotExists as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["ETag"] = etag
+    return task
 
 
 @router.put("/{task_id}", response_model=TaskRead)
-def update_task(
+async def update_task(
     task_id: int,
     data: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskRead:
     """Update task with id.
 
     Args:
         task_id (int): Task id.
         data (TaskUpdate): Data to update from task.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
         TaskRead: Dta from task.
     """
     service = TaskService(db)
-    return service.update_task(task_id, data)
+    try:
+        return await service.update_task(task_id, data)
+    except TaskDoesNotExists as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.delete("/{task_id}", response_model=dict)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> dict:
     """Delete Task with id.
 
     Args:
         task_id (int): Task id to delete.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
         bool:
     """
     service = TaskService(db)
     try:
-        service.delete_task(task_id)
+        await service.delete_task(task_id)
         return {"message": "The task was successfully deleted"}
     except TaskDoesNotExists as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.patch("/update-status/{task_id}", response_model=TaskRead)
-def update_status_task(
+async def update_status_task(
     task_id: int,
     data: TaskStatusUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskRead:
     """Update status for a task with id.
 
     Args:
         task_id (int): Task id.
         status (TaskStatusEnum): Status to update from task.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
         TaskRead: Dta from task.
     """
     service = TaskService(db)
-    return service.update_task(task_id, TaskUpdate(status=data.status))
+    try:
+        return await service.update_task(task_id, TaskUpdate(status=data.status))
+    except TaskDoesNotExists as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.patch("/update-in-charge/{task_id}", response_model=TaskRead)
-def update_in_charge_task(
+async def update_in_charge_task(
     task_id: int,
     data: TaskInChargeUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskRead:
     """Update status for a task with id.
 
     Args:
         task_id (int): Task id.
         status (TaskStatusEnum): Status to update from task.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): User from request in JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): User from request in JWT.
 
     Returns:
         TaskRead: Dta from task.
     """
     service = TaskService(db)
     try:
-        return service.update_task(task_id, TaskUpdate(user_id=data.user_id))
+        return await service.update_task(task_id, TaskUpdate(user_id=data.user_id))
     except TaskDoesNotExists as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/task-list", response_model=TaskListRead)
-def create_task_list(
+async def create_task_list(
     data: TaskListCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskListRead:
     """
     Create a new task list, if user id dont send, the task list will be
@@ -205,8 +478,9 @@ def create_task_list(
 
     Args:
         data (TaskListCreate): Task list input data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): Authenticated user from JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): Authenticated user from JWT.
 
     Returns:
         TaskListRead: The created task list.
@@ -214,49 +488,70 @@ def create_task_list(
     if not data.user_id:
         data.user_id = current_user.id
     service = TaskListService(db)
-    return service.create_task_list(data)
+    return await service.create_task_list(data)
 
 
 @router.post("/task-list-with-tasks", response_model=TaskListRead)
-def create_task_list_with_tasks(
+async def create_task_list_with_tasks(
     data: TaskListWithTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserRead = Depends(get_current_user),
 ) -> TaskListRead:
     """
     Create a new task list along with associated tasks.
 
     Args:
         data (TaskListWithTasks): Task list and task creation data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): Authenticated user from JWT.
+        db (AsyncSession, optional): Database session.
+        Defaults to Depends(get_async_db).
+        current_user (UserRead, optional): Authenticated user from JWT.
 
     Returns:
         TaskListRead: The created task list with tasks.
     """
     data.task_list.user_id = current_user.id
     service = TaskListService(db)
-    return service.create_task_list_with_tasks(data)
+    return await service.create_task_list_with_tasks(data)
 
 
 @router.get("/task-list/{task_list_id}", response_model=TaskListRead)
-def get_task_list(
+async def get_task_list(
     task_list_id: int,
     filters: TaskListFilter = Depends(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> TaskListRead:
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserRead = Depends(get_current_user),
+) -> Response:
     """
     Retrieve a specific task list by ID, with optional filters for tasks.
 
+    When limit is sent the tasks are paginated, the cursor to the next page
+    of tasks is returned in the X-Next-Cursor header. The task list ETag is
+    returned in the ETag header, when If-None-Match matches it 304 Not Modified
+    is answered after a version lookup, without loading the tasks.
+
     Args:
         task_list_id (int): Task list ID to retrieve.
-        filters (TaskListFilter, optional): Optional filters.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
-        current_user (User, optional): Authenticated user from JWT.
+        filters (TaskListFilter, optional): Optional filters and pagination.
+        if_none_match (Optional[str], optional): ETags of the client copies.
+        Defaults to Header(None).
+        db (AsyncSession, optional): Read database session.
+        Defaults to Depends(get_read_db).
+        current_user (UserRead, optional): Authenticated user from JWT.
 
     Returns:
-        TaskListRead: Task list with filtered tasks and completeness percentage.
+        Response: TaskListRead JSON, task list with filtered tasks and
+        completeness percentage.
     """
     service = TaskListService(db)
-    return service.get_task_list(task_list_id, filters)
+    try:
+        etag = await service.get_task_list_etag(task_list_id, filters)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        task_list, next_cursor = await service.get_task_list(task_list_id, filters)
+    except (TaskListDoesNotExists, InvalidCursor) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(TASK_LIST_READ, task_list, headers)
@@ -0,0 +1,405 @@
+"""Generate a large synthetic dataset of users, task lists and tasks.
+
+Rows are generated from a seed with realistic distributions: list sizes and
+list owners follow a Zipf law, most tasks are in charge of the list owner and
+the rest are shared among users that are also Zipf distributed, and statuses
+and priorities follow a fixed mix. Rows are loaded with COPY in chunks by a
+pool of worker processes, every chunk with its own random generator, so the
+same seed and chunk size give the same data with any number of workers.
+
+All users get the same password, hashed once with bcrypt. The id sequences
+are moved past the loaded ids and the task counters of the lists are filled
+from the generated tasks.
+
+Usage:
+    python -m app.cli.generate_data --tasks 10000000 --lists 200000 --users 50000
+    python -m app.cli.generate_data --seed 7 --workers 8 --truncate
+"""
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.enums.general_enums import PriorityEnum, TaskStatusEnum
+from app.core.settings import settings
+from app.db.session import get_async_url
+from app.services.password import pwd_context
+
+CHUNK_SIZE = 200_000
+# Share of the tasks in charge of the owner of their list, the rest go to
+# other users.
+OWNER_SHARE = 0.6
+STATUS_WEIGHTS = {
+    TaskStatusEnum.PENDING: 30,
+    TaskStatusEnum.IN_PROGRESS: 15,
+    TaskStatusEnum.COMPLETED: 45,
+    TaskStatusEnum.CANCELLED: 10,
+}
+PRIORITY_WEIGHTS = {
+    PriorityEnum.LOW: 50,
+    PriorityEnum.MEDIUM: 35,
+    PriorityEnum.HIGH: 15,
+}
+VERBS = (
+    "Review Write Update Fix Plan Test Deploy Call Prepare Schedule Migrate "
+    "Document Refactor Design"
+).split()
+NOUNS = (
+    "invoice report budget release meeting contract backlog roadmap dashboard "
+    "newsletter onboarding inventory survey campaign audit presentation "
+    "checklist proposal"
+).split()
+TABLE_COLUMNS = {
+    "users": ("id", "full_name", "email", "password"),
+    "task_lists": ("id", "name", "user_id"),
+    "tasks": ("id", "user_id", "task_list_id", "description", "status", "priority"),
+}
+
+# Plan of the dataset, set once per worker process by init_worker.
+_plan: dict = {}
+
+
+def zipf_cum_weights(size: int, exponent: float) -> list[float]:
+    """Get the cumulative weights of the ranks 1..size of a Zipf law.
+
+    Args:
+        size (int): Number of ranks.
+        exponent (float): Zipf exponent, higher values skew more.
+
+    Returns:
+        list[float]: Cumulative weights, for random.choices.
+    """
+    return list(itertools.accumulate(rank**-exponent for rank in range(1, size + 1)))
+
+
+def chunk_random(seed: int, table: str, start: int) -> random.Random:
+    """Get the random generator of a chunk, independent of the other chunks.
+
+    Args:
+        seed (int): Dataset seed.
+        table (str): Table of the chunk.
+        start (int): First id of the chunk.
+
+    Returns:
+        random.Random: Seeded generator.
+    """
+    return random.Random(f"{seed}:{table}:{start}")
+
+
+def build_plan(
+    seed: int, users: int, lists: int, exponent: float, password: str
+) -> dict:
+    """Draw the parts of the dataset shared by all the chunks.
+
+    Which lists and users are the popular ones is shuffled, so the biggest
+    lists are not the lowest ids.
+
+    Args:
+        seed (int): Dataset seed.
+        users (int): Number of users.
+        lists (int): Number of task lists.
+        exponent (float): Zipf exponent of list sizes and users.
+        password (str): Password of every user.
+
+    Returns:
+        dict: Seed, password hash, list and user ids by popularity rank with
+        their cumulative weights, and the owner of every list.
+    """
+    rng = random.Random(seed)
+    list_ids = list(range(1, lists + 1))
+    rng.shuffle(list_ids)
+    user_ids = list(range(1, users + 1))
+    rng.shuffle(user_ids)
+    user_weights = zipf_cum_weights(users, exponent)
+    return {
+        "seed": seed,
+        "password_hash": pwd_context.hash(password),
+        "list_ids": list_ids,
+        "list_weights": zipf_cum_weights(lists, exponent),
+        "user_ids": user_ids,
+        "user_weights": user_weights,
+        # owners[list_id - 1] is the owner of the list.
+        "owners": rng.choices(user_ids, cum_weights=user_weights, k=lists),
+    }
+
+
+def user_records(plan: dict, start: int, stop: int) -> list[tuple]:
+    """Generate the users with ids in [start, stop).
+
+    Args:
+        plan (dict): Dataset plan.
+        start (int): First id.
+        stop (int): Id after the last one.
+
+    Returns:
+        list[tuple]: Rows in TABLE_COLUMNS["users"] order.
+    """
+    password_hash = plan["password_hash"]
+    return [
+        (i, f"User {i}", f"user{i}@example.com", password_hash)
+        for i in range(start, stop)
+    ]
+
+
+def task_list_records(plan: dict, start: int, stop: int) -> list[tuple]:
+    """Generate the task lists with ids in [start, stop).
+
+    Args:
+        plan (dict): Dataset plan.
+        start (int): First id.
+        stop (int): Id after the last one.
+
+    Returns:
+        list[tuple]: Rows in TABLE_COLUMNS["task_lists"] order.
+    """
+    rng = chunk_random(plan["seed"], "task_lists", start)
+    owners = plan["owners"]
+    return [
+        (i, f"{rng.choice(NOUNS).capitalize()} {i}", owners[i - 1])
+        for i in range(start, stop)
+    ]
+
+
+def task_records(plan: dict, start: int, stop: int) -> list[tuple]:
+    """Generate the tasks with ids in [start, stop).
+
+    Args:
+        plan (dict): Dataset plan.
+        start (int): First id.
+        stop (int): Id after the last one.
+
+    Returns:
+        list[tuple]: Rows in TABLE_COLUMNS["tasks"] order, status and priority
+        by name as the enums are stored.
+    """
+    rng = chunk_random(plan["seed"], "tasks", start)
+    size = stop - start
+    list_ids = rng.choices(plan["list_ids"], cum_weights=plan["list_weights"], k=size)
+    shared = rng.choices(plan["user_ids"], cum_weights=plan["user_weights"], k=size)
+    statuses = rng.choices(
+        [status.name for status in STATUS_WEIGHTS],
+        weights=list(STATUS_WEIGHTS.values()),
+        k=size,
+    )
+    priorities = rng.choices(
+        [priority.name for priority in PRIORITY_WEIGHTS],
+        weights=list(PRIORITY_WEIGHTS.values()),
+        k=size,
+    )
+    owners = plan["owners"]
+    return [
+        (
+            i,
+            owners[list_id - 1] if rng.random() < OWNER_SHARE else user_id,
+            list_id,
+            f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {i}",
+            status,
+            priority,
+        )
+        for i, list_id, user_id, status, priority in zip(
+            range(start, stop), list_ids, shared, statuses, priorities
+        )
+    ]
+
+
+GENERATORS = {
+    "users": user_records,
+    "task_lists": task_list_records,
+    "tasks": task_records,
+}
+
+
+def init_worker(plan: dict) -> None:
+    """Keep the dataset plan in the worker process.
+
+    Args:
+        plan (dict): Dataset plan.
+    """
+    global _plan
+    _plan = plan
+
+
+def load_chunk(database_url: str, table: str, start: int, stop: int) -> dict:
+    """Generate a chunk of a table and load it with COPY, runs in the workers.
+
+    Args:
+        database_url (str): Database url.
+        table (str): Table name.
+        start (int): First id.
+        stop (int): Id after the last one.
+
+    Returns:
+        dict: Total and completed tasks by task list id, empty for the other
+        tables.
+    """
+    records = GENERATORS[table](_plan, start, stop)
+    asyncio.run(copy_records(database_url, table, records))
+    counts = defaultdict(lambda: [0, 0])
+    if table == "tasks":
+        completed = TaskStatusEnum.COMPLETED.name
+        for _, _, task_list_id, _, status, _ in records:
+            count = counts[task_list_id]
+            count[0] += 1
+            count[1] += status == completed
+    return dict(counts)
+
+
+async def copy_records(database_url: str, table: str, records: list[tuple]) -> None:
+    """Load records into a table with COPY.
+
+    Args:
+        database_url (str): Database url.
+        table (str): Table name.
+        records (list[tuple]): Rows in TABLE_COLUMNS order.
+    """
+    engine = create_async_engine(get_async_url(database_url), poolclass=NullPool)
+    try:
+        async with engine.begin() as connection:
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                table, records=records, columns=TABLE_COLUMNS[table]
+            )
+    finally:
+        await engine.dispose()
+
+
+async def load_table(
+    executor: ProcessPoolExecutor,
+    database_url: str,
+    table: str,
+    rows: int,
+    chunk_size: int,
+) -> list[dict]:
+    """Load the rows of a table in parallel chunks.
+
+    Args:
+        executor (ProcessPoolExecutor): Worker processes.
+        database_url (str): Database url.
+        table (str): Table name.
+        rows (int): Number of rows.
+        chunk_size (int): Rows per chunk.
+
+    Returns:
+        list[dict]: Result of load_chunk for every chunk.
+    """
+    loop = asyncio.get_running_loop()
+    started_at = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor,
+                load_chunk,
+                database_url,
+                table,
+                start,
+                min(start + chunk_size, rows + 1),
+            )
+            for start in range(1, rows + 1, chunk_size)
+        )
+    )
+    elapsed = time.perf_counter() - started_at
+    print(f"  {table:<10} {rows:>12} rows in {elapsed:8.1f} s")
+    return results
+
+
+async def generate(args: argparse.Namespace) -> None:
+    """Generate and load the dataset.
+
+    Args:
+        args (argparse.Namespace): Command arguments.
+
+    Raises:
+        SystemExit: If the tables have rows and --truncate was not given.
+    """
+    engine = create_async_engine(get_async_url(args.database_url), poolclass=NullPool)
+    async with engine.begin() as conn:
+        if args.truncate:
+            await conn.execute(
+                text(
+                    "TRUNCATE TABLE users, task_lists, tasks, notification_outbox "
+                    "RESTART IDENTITY CASCADE"
+                )
+            )
+        elif await conn.scalar(text("SELECT EXISTS (SELECT 1 FROM users)")):
+            raise SystemExit("The tables have rows, use --truncate to replace them")
+
+    plan = build_plan(args.seed, args.users, args.lists, args.zipf, args.password)
+    print(f"Loading with {args.workers} workers:")
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(plan,),
+    ) as executor:
+        for table, rows in (("users", args.users), ("task_lists", args.lists)):
+            await load_table(executor, args.database_url, table, rows, args.chunk_size)
+        chunks = await load_table(
+            executor, args.database_url, "tasks", args.tasks, args.chunk_size
+        )
+
+    counts = defaultdict(lambda: [0, 0])
+    for chunk in chunks:
+        for task_list_id, (total, completed) in chunk.items():
+            count = counts[task_list_id]
+            count[0] += total
+            count[1] += completed
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "UPDATE task_lists SET total_tasks = counts.total, "
+                "completed_tasks = counts.completed "
+                "FROM unnest(CAST(:ids AS integer[]), CAST(:totals AS integer[]), "
+                "CAST(:completed AS integer[])) AS counts (id, total, completed) "
+                "WHERE task_lists.id = counts.id"
+            ),
+            {
+                "ids": list(counts),
+                "totals": [total for total, _ in counts.values()],
+                "completed": [completed for _, completed in counts.values()],
+            },
+        )
+        for table in TABLE_COLUMNS:
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                )
+            )
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users, task_lists, tasks"))
+    await engine.dispose()
+
+
+def main() -> None:
+    """Generate the dataset and print the load time of every table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--lists", type=int, default=200_000)
+    parser.add_argument("--tasks", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--password", default="password", help="Password of every user")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--truncate", action="store_true", help="Empty the tables before loading"
+    )
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    asyncio.run(generate(args))
+    print(f"Done in {time.perf_counter() - started_at:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Import tasks from a CSV or NDJSON file with COPY.
+
+Reads the file in chunks and loads it in batches with the same service as
+POST /tasks/import. The columns are those of GET /tasks/export: description
+and priority are required, user_id, task_list_id and status are optional.
+
+Usage:
+    python -m app.cli.import_tasks tasks.csv --user-id 1
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+from app.core.enums.general_enums import ExportFormat
+from app.db.models import task, user  # noqa: F401
+from app.db.session import AsyncSessionLocal, async_engine
+from app.schemas.task import TaskImportResult
+from app.services.task_import import TaskImportService
+
+CHUNK_SIZE = 1 << 20
+
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    """Read a file in chunks.
+
+    Args:
+        path (Path): File path.
+
+    Yields:
+        AsyncIterator[bytes]: Chunks of CHUNK_SIZE bytes.
+    """
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def import_file(
+    path: Path, import_format: ExportFormat, user_id: int | None
+) -> TaskImportResult:
+    """Import the tasks of a file.
+
+    Args:
+        path (Path): File path.
+        import_format (ExportFormat): NDJSON or CSV.
+        user_id (int | None): User in charge of the rows without user_id.
+
+    Returns:
+        TaskImportResult: Imported tasks and rejected rows.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await TaskImportService(db).import_tasks(
+            read_chunks(path), import_format, user_id
+        )
+    await async_engine.dispose()
+    return result
+
+
+def main() -> None:
+    """Import the file and print the rejected rows."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        type=ExportFormat,
+        choices=list(ExportFormat),
+        help="Defaults to the file extension",
+    )
+    parser.add_argument("--user-id", type=int, help="User of rows without user_id")
+    args = parser.parse_args()
+
+    import_format = args.format or ExportFormat(args.path.suffix.lstrip(".").lower())
+    result = asyncio.run(import_file(args.path, import_format, args.user_id))
+    print(f"Imported {result.imported} tasks, rejected {result.failed} rows")
+    for error in result.errors:
+        print(f"  line {error.line}: {error.error}")
+
+
+if __name__ == "__main__":
+    main()
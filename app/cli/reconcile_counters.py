@@ -0,0 +1,46 @@
+"""Repair drifted task counters of task lists.
+
+Recounts the tasks of every task list in batches and fixes the lists whose
+total_tasks / completed_tasks counters do not match. Each batch locks only its
+lists, so it can run while the API is serving writes.
+
+Usage:
+    python -m app.cli.reconcile_counters --batch-size 1000
+"""
+
+import argparse
+import asyncio
+from app.db.models import task, user  # noqa: F401
+from app.db.session import AsyncSessionLocal, async_engine
+from app.services.task import TaskListService
+
+
+async def reconcile(batch_size: int) -> list[int]:
+    """Reconcile the counters of all the task lists.
+
+    Args:
+        batch_size (int): Number of lists locked and recounted per transaction.
+
+    Returns:
+        list[int]: Ids of the repaired lists.
+    """
+    async with AsyncSessionLocal() as db:
+        repaired = await TaskListService(db).reconcile_counters(batch_size)
+    await async_engine.dispose()
+    return repaired
+
+
+def main() -> None:
+    """Reconcile the counters and print the repaired lists."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    repaired = asyncio.run(reconcile(args.batch_size))
+    print(f"Repaired {len(repaired)} task lists")
+    for task_list_id in repaired:
+        print(f"  {task_list_id}")
+
+
+if __name__ == "__main__":
+    main()
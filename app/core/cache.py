@@ -0,0 +1,110 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+from app.core.metrics import REGISTRY, CallbackMetric
+from app.core.settings import settings
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a time to live.
+
+    Attributes:
+        max_size (int): Max number of entries, the least recently used entry
+        is evicted when it is full.
+        ttl (float): Default time to live of entries in seconds.
+        hits (int): Number of lookups answered by the cache.
+        misses (int): Number of lookups not found or expired.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Constructor class method.
+
+        Args:
+            max_size (int): Max number of entries.
+            ttl (float): Default time to live of entries in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a value if it is cached and not expired.
+
+        Args:
+            key (Hashable): Entry key.
+
+        Returns:
+            Any | None: Cached value, None if not found or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Cache a value.
+
+        Args:
+            key (Hashable): Entry key.
+            value (Any): Value to cache.
+            ttl (float | None, optional): Time to live in seconds, capped by the
+            cache ttl. Defaults to None (the cache ttl).
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an entry if it is cached.
+
+        Args:
+            key (Hashable): Entry key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get cache counters.
+
+        Returns:
+            dict: size, hits and misses of the cache.
+        """
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Authenticated users by token subject. Invalidation is local to the process,
+# in multi worker deployments the ttl bounds how long a stale user is served.
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+for _stat, _type in (("hits", "counter"), ("misses", "counter"), ("size", "gauge")):
+    REGISTRY.register(
+        CallbackMetric(
+            f"principal_cache_{_stat}{'_total' if _type == 'counter' else ''}",
+            f"Authenticated user cache {_stat}.",
+            lambda stat=_stat: [({}, principal_cache.stats()[stat])],
+            _type,
+        )
+    )
@@ -24,3 +24,43 @@ class TaskStatusEnum(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
+
+
+class ExportFormat(str, Enum):
+    """
+    Represents the file format of a tasks export.
+
+    - `NDJSON`: One JSON object per line.
+    - `CSV`: Comma separated values with a header row.
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class NotificationStatusEnum(str, Enum):
+    """
+    Represents the delivery status of an outbox notification.
+
+    - `PENDING`: Waiting to be sent or retried.
+    - `SENT`: Delivered to the sender.
+    - `FAILED`: Gave up after the max number of attempts.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class SlowQueryOrder(str, Enum):
+    """
+    Represents how the slowest statement fingerprints are sorted.
+
+    - `MAX`: Slowest single execution.
+    - `MEAN`: Mean duration of the executions.
+    - `TOTAL`: Time spent in all the executions.
+    """
+
+    MAX = "max"
+    MEAN = "mean"
+    TOTAL = "total"
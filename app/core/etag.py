@@ -0,0 +1,36 @@
+import hashlib
+import json
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the parts that identify a representation.
+
+    Args:
+        *parts: JSON serializable values, e.g. kind, id, row version and query.
+
+    Returns:
+        str: Quoted opaque ETag.
+    """
+    raw = json.dumps(parts, separators=(",", ":"), sort_keys=True, default=str)
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag.
+
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+
+    Args:
+        if_none_match (str | None): If-None-Match header from request.
+        etag (str): Current ETag of the representation.
+
+    Returns:
+        bool: True if the client copy is current and 304 can be answered.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,234 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Iterable
+
+
+Sample = tuple[dict, float]
+
+
+def _format_labels(labels: dict) -> str:
+    """Format labels in the Prometheus text format.
+
+    Args:
+        labels (dict): Label names and values.
+
+    Returns:
+        str: Formatted labels, empty when there are no labels.
+    """
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"'.replace("\n", "\\n"))
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC):
+    """Base class of metrics exported in the Prometheus text format."""
+
+    type_ = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()) -> None:
+        """Constructor class method.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Metric help text.
+            labelnames (tuple, optional): Label names. Defaults to ().
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        """Get the values of the labels in labelnames order.
+
+        Args:
+            labels (dict): Label names and values.
+
+        Returns:
+            tuple: Label values.
+        """
+        return tuple(labels[name] for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        """Get the samples of the metric.
+
+        Returns:
+            Iterable[tuple[str, dict, float]]: Sample name, labels and value.
+        """
+
+    def render(self) -> str:
+        """Render the metric in the Prometheus text format.
+
+        Returns:
+            str: Metric help, type and samples.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {float(value)!r}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonic counter."""
+
+    type_ = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()) -> None:
+        """Constructor class method.
+
+        Args:
+            name (str): Metric name, should end with _total.
+            documentation (str): Metric help text.
+            labelnames (tuple, optional): Label names. Defaults to ().
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Increment the counter.
+
+        Args:
+            amount (float, optional): Amount to add. Defaults to 1.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        for key, value in list(self._values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    """Histogram of observed values with cumulative buckets."""
+
+    type_ = "histogram"
+
+    DEFAULT_BUCKETS = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> None:
+        """Constructor class method.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Metric help text.
+            labelnames (tuple, optional): Label names. Defaults to ().
+            buckets (tuple, optional): Sorted bucket upper bounds.
+            Defaults to DEFAULT_BUCKETS.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Observe a value.
+
+        Args:
+            value (float): Observed value.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        for key, (counts, total, count) in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": repr(bound)}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read from a callback on every scrape."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Sample]],
+        type_: str = "gauge",
+    ) -> None:
+        """Constructor class method.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Metric help text.
+            callback (Callable[[], Iterable[Sample]]): Returns (labels, value)
+            samples.
+            type_ (str, optional): Prometheus type, gauge or counter.
+            Defaults to "gauge".
+        """
+        super().__init__(name, documentation)
+        self.callback = callback
+        self.type_ = type_
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        for labels, value in self.callback():
+            yield self.name, labels, value
+
+
+class Registry:
+    """Collection of the metrics exported by the /metrics endpoint."""
+
+    def __init__(self) -> None:
+        """Constructor class method."""
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Register a metric, replacing any metric with the same name.
+
+        Args:
+            metric (Metric): Metric to export.
+
+        Returns:
+            Metric: The registered metric.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all the metrics in the Prometheus text format.
+
+        Returns:
+            str: Text exposition of the metrics.
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from app.exceptions import InvalidCursor
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset position as an opaque cursor.
+
+    Args:
+        position (dict): Keyset values of the last returned row.
+
+    Returns:
+        str: Url safe opaque cursor.
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode an opaque cursor generated by encode_cursor.
+
+    Args:
+        cursor (str): Opaque cursor from request.
+
+    Raises:
+        InvalidCursor: If the cursor was not generated by the API.
+
+    Returns:
+        dict: Keyset values of the last returned row.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(position, dict):
+        raise InvalidCursor(cursor)
+    return position
@@ -0,0 +1,131 @@
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import REGISTRY, Counter, Histogram
+
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+http_requests_total = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "Requests by method, route template and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_request_seconds = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to answer a request, including the streamed body.",
+        ("method", "route"),
+    )
+)
+http_request_db_queries = REGISTRY.register(
+    Histogram(
+        "http_request_db_queries",
+        "SQL statements executed per request.",
+        ("method", "route"),
+        QUERY_BUCKETS,
+    )
+)
+http_request_db_seconds = REGISTRY.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time spent executing SQL statements per request.",
+        ("method", "route"),
+    )
+)
+
+
+class RequestStats:
+    """Database work of the request being served."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self) -> None:
+        """Constructor class method."""
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Stats of the current request, None outside requests (e.g. the dispatcher).
+# The object is mutated in place, so the greenlets of the async engines and
+# the tasks started by the request update the same stats.
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Count the statements and their time in the stats of the current request.
+
+    Args:
+        engine (Engine): Sync engine, the sync_engine of async engines.
+
+    Returns:
+        Engine: The same engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and request_stats.get() is not None:
+            context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_query(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        started_at = getattr(context, "_query_started_at", None)
+        if stats is not None and started_at is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - started_at
+
+    return engine
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware that records the latency and database work per route.
+
+    Routes are labeled by their path template (e.g. /tasks/{task_id}) so the
+    number of series stays bounded, requests that match no route are labeled
+    unmatched.
+    """
+
+    def __init__(self, app) -> None:
+        """Constructor class method.
+
+        Args:
+            app (ASGIApp): Wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            request_stats.reset(token)
+            route = scope.get("route")
+            labels = {
+                "method": scope["method"],
+                "route": getattr(route, "path", "unmatched"),
+            }
+            http_requests_total.inc(**labels, status=status)
+            http_request_seconds.observe(elapsed, **labels)
+            http_request_db_queries.observe(stats.queries, **labels)
+            http_request_db_seconds.observe(stats.db_seconds, **labels)
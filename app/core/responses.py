@@ -0,0 +1,28 @@
+from typing import Any
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(
+    adapter: TypeAdapter, content: Any, headers: dict[str, str] | None = None
+) -> Response:
+    """Build a JSON response serialized straight to bytes by pydantic.
+
+    Returning a Response skips the response_model validation and the
+    jsonable_encoder pass of FastAPI, so content must be already validated.
+    The route keeps its response_model for the OpenAPI schema.
+
+    Args:
+        adapter (TypeAdapter): Precompiled adapter of the content type.
+        content (Any): Validated content, e.g. a list of schemas.
+        headers (dict[str, str] | None, optional): Response headers.
+        Defaults to None.
+
+    Returns:
+        Response: application/json response.
+    """
+    return Response(
+        content=adapter.dump_json(content),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -8,9 +8,45 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     TEST_DATABASE_URL: str
 
+    READ_DATABASE_URL: str | None = None
+    READ_YOUR_WRITES_SECONDS: float = 5
+    READ_PIN_CACHE_MAX_SIZE: int = 10_000
+    READ_REPLICA_RETRY_SECONDS: float = 30
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_PGBOUNCER_MODE: bool = False
+
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.0
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 10_000
+    SLOW_QUERY_BUFFER_SIZE: int = 500
+    SLOW_QUERY_LOG_FILE: str | None = None
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    ADMIN_EMAILS: list[str] = []
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    NOTIFICATION_DISPATCHER_ENABLED: bool = True
+    NOTIFICATION_SENDER: str = "logging"
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_POLL_SECONDS: float = 1.0
+    NOTIFICATION_LEASE_SECONDS: float = 60
+    NOTIFICATION_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_BACKOFF_SECONDS: float = 2.0
+    NOTIFICATION_MAX_BACKOFF_SECONDS: float = 600
+
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,62 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy import Enum as SqlEnum
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.enums.general_enums import NotificationStatusEnum
+from app.db.base import Base
+
+
+class NotificationOutbox(Base):
+    """
+    ORM model representing a notification waiting to be sent.
+
+    Rows are written in the transaction of the change they notify and sent
+    later by the notification dispatcher.
+
+    Attributes:
+        id (int): Unique identifier for the notification.
+        kind (str): Type of notification, e.g. task_assignment.
+        dedup_key (str): Key of the notified event, a single pending
+        notification exists per key.
+        payload (dict): Data needed to render the notification.
+        status (str): Delivery status.
+        attempts (int): Number of delivery attempts.
+        available_at (datetime): When the next attempt may run.
+        created_at (datetime): When the notification was written.
+        sent_at (datetime): When the notification was delivered.
+        last_error (str): Error of the last failed attempt.
+    """
+
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index(
+            "ix_notification_outbox_dedup_key_pending",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "ix_notification_outbox_available_at_pending",
+            "available_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    dedup_key = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(
+        SqlEnum(NotificationStatusEnum, name="notification_status_enum"),
+        nullable=False,
+        default=NotificationStatusEnum.PENDING,
+        server_default=NotificationStatusEnum.PENDING.name,
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    sent_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
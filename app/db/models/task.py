@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy import Enum as SqlEnum
 from app.core.enums.general_enums import PriorityEnum, TaskStatusEnum
 from app.db.base import Base
@@ -16,11 +17,26 @@ class Task(Base):
         description (str): Description or details of the task.
         complete (bool): Indicates whether the task is completed.
         priority (str): Priority level of the task.
+        version (int): Row version, incremented on every update.
+        search_vector (str): Full text search document generated from the
+        description.
         in_charge (User): The user responsible for completing the task.
         task_list (TaskList): The task list to which this task belongs.
     """
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index(
+            "ix_tasks_task_list_id_status",
+            "task_list_id",
+            "status",
+            postgresql_include=["priority"],
+        ),
+        Index("ix_tasks_task_list_id_id", "task_list_id", "id"),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -36,6 +52,18 @@ class Task(Base):
         nullable=False,
         default=PriorityEnum.LOW,
     )
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # The simple configuration does not stem, so it works for descriptions in
+    # any language, prefix matching covers word variations. It is deferred so
+    # loading tasks does not read it.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('simple', coalesce(description, ''))", persisted=True
+            ),
+        )
+    )
 
     in_charge = relationship("User", back_populates="tasks")
     task_list = relationship("TaskList", back_populates="tasks")
@@ -49,15 +77,23 @@ class TaskList(Base):
         id (int): Unique identifier for the task list.
         name (str): Name of the task list.
         user_id (int): Foreign key referencing the user who owns this task list.
+        total_tasks (int): Number of tasks of the list.
+        completed_tasks (int): Number of completed tasks of the list.
+        version (int): Row version, incremented when the list or any of its
+        tasks changes.
         user (User): The user who owns this task list.
         tasks (List[Task]): List of tasks associated with this task list.
     """
 
     __tablename__ = "task_lists"
+    __table_args__ = (Index("ix_task_lists_user_id", "user_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    total_tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     user = relationship("User", back_populates="task_lists")
     tasks = relationship("Task", back_populates="task_list")
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.enums.general_enums import NotificationStatusEnum
+from app.db.models.notification import NotificationOutbox
+
+TASK_ASSIGNMENT = "task_assignment"
+
+
+def assignment_notification(user_id: int, task_id: int) -> dict:
+    """Build the outbox row of a task assigned to a user.
+
+    Args:
+        user_id (int): New user in charge of the task.
+        task_id (int): Task id.
+
+    Returns:
+        dict: Outbox row values.
+    """
+    return {
+        "kind": TASK_ASSIGNMENT,
+        "dedup_key": f"{TASK_ASSIGNMENT}:{task_id}:{user_id}",
+        "payload": {"user_id": user_id, "task_id": task_id},
+    }
+
+
+class NotificationRepository:
+    """NotificationOutbox class repository."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Constructor class method.
+
+        Args:
+            db (AsyncSession): Session from database.
+        """
+        self.db = db
+
+    async def enqueue(self, notifications: list[dict]) -> None:
+        """Write notifications to the outbox.
+
+        Does not commit, so they are part of the transaction of the change they
+        notify. A notification whose dedup_key is already pending is skipped.
+
+        Args:
+            notifications (list[dict]): kind, dedup_key and payload of each row.
+        """
+        if not notifications:
+            return
+        await self.db.execute(
+            insert(NotificationOutbox)
+            .values(notifications)
+            .on_conflict_do_nothing(
+                index_elements=[NotificationOutbox.dedup_key],
+                index_where=NotificationOutbox.status == NotificationStatusEnum.PENDING,
+            )
+        )
+
+    async def claim(self, limit: int, lease: timedelta) -> list[Row]:
+        """Claim a batch of due notifications and commit.
+
+        The rows are locked with FOR UPDATE SKIP LOCKED, so several dispatchers
+        claim different rows, and leased: their next attempt is pushed back by
+        lease, so a dispatcher that dies mid batch does not lose them.
+
+        Args:
+            limit (int): Max number of notifications.
+            lease (timedelta): Time to send them before another dispatcher may.
+
+        Returns:
+            list[Row]: Claimed notifications, attempts already incremented.
+        """
+        due = (
+            select(NotificationOutbox.id)
+            .where(
+                NotificationOutbox.status == NotificationStatusEnum.PENDING,
+                NotificationOutbox.available_at <= func.now(),
+            )
+            .order_by(NotificationOutbox.available_at, NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                available_at=func.now() + lease,
+            )
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.kind,
+                NotificationOutbox.dedup_key,
+                NotificationOutbox.payload,
+                NotificationOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result.all())
+        await self.db.commit()
+        return rows
+
+    async def mark_sent(self, ids: list[int]) -> None:
+        """Mark notifications as sent and commit.
+
+        Args:
+            ids (list[int]): Notification ids.
+        """
+        if ids:
+            await self.db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ids))
+                .values(status=NotificationStatusEnum.SENT, sent_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.commit()
+
+    async def mark_failed(
+        self, notification_id: int, error: str, retry_at: datetime | None
+    ) -> None:
+        """Record a failed attempt and commit.
+
+        Args:
+            notification_id (int): Notification id.
+            error (str): Error of the attempt.
+            retry_at (datetime | None): When to retry, None to give up.
+        """
+        values = {"last_error": error}
+        if retry_at is None:
+            values["status"] = NotificationStatusEnum.FAILED
+        else:
+            values["available_at"] = retry_at
+        await self.db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == notification_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
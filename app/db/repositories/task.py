@@ -1,21 +1,199 @@
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from typing import AsyncIterator, Iterable
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Float,
+    Integer,
+    MetaData,
+    Row,
+    Select,
+    and_,
+    any_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    Table,
+    Text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.enums.general_enums import TaskStatusEnum
 from app.db.models.task import Task, TaskList
-from app.schemas.task import TaskCreate, TaskUpdate, TaskListCreate, TaskListUpdate
+from app.db.models.user import User
+from app.db.repositories.notification import (
+    NotificationRepository,
+    assignment_notification,
+)
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskListCreate,
+    TaskListUpdate,
+    TaskFilter,
+)
 from sqlalchemy.orm import selectinload
+from sqlalchemy.schema import CreateTable
+
+
+TASK_COLUMNS = (
+    Task.id,
+    Task.user_id,
+    Task.task_list_id,
+    Task.description,
+    Task.status,
+    Task.priority,
+)
+TASK_FIELDS = tuple(column.key for column in TASK_COLUMNS)
+
+
+# Staging table of an import batch, rows are copied here and inserted in tasks
+# with one INSERT ... SELECT. It is dropped when the batch transaction ends.
+task_import = Table(
+    "task_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("user_id", Integer),
+    Column("task_list_id", Integer),
+    Column("description", Text),
+    Column("status", Text, nullable=False),
+    Column("priority", Text, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def ids_in(column, ids: list[int]) -> ColumnElement:
+    """Build a column = ANY(:ids) condition with the ids bound as one array.
+
+    Args:
+        column: Integer column to compare.
+        ids (list[int]): Ids to match.
+
+    Returns:
+        ColumnElement: SQL condition.
+    """
+    return column == any_(literal(ids, ARRAY(Integer)))
+
+
+def is_completed(status) -> bool:
+    """Check if a task status is completed.
+
+    Args:
+        status: Status enum, its value or its name as stored by the database.
+
+    Returns:
+        bool: True if the status is completed.
+    """
+    return status == TaskStatusEnum.COMPLETED or status == TaskStatusEnum.COMPLETED.name
+
+
+def task_count(task_list_id: int | None, status, sign: int = 1) -> tuple:
+    """Build the task list counters change of adding or removing a task.
+
+    Args:
+        task_list_id (int | None): Task list of the task.
+        status: Status of the task.
+        sign (int, optional): 1 when the task is added to the list, -1 when it
+        is removed. Defaults to 1.
+
+    Returns:
+        tuple: (task_list_id, total change, completed change).
+    """
+    return task_list_id, sign, sign * is_completed(status)
+
+
+async def update_task_lists(
+    db: AsyncSession, changes: Iterable[tuple[int | None, int, int]]
+) -> None:
+    """Apply task counter changes to task lists and increment their version.
+
+    All the lists are updated by one UPDATE ... FROM unnest(...) statement, in
+    the transaction of the task changes, so the counters never drift from the
+    tasks. A CTE locks the lists in id order first, whatever the join plan of
+    the UPDATE, so transactions changing the same lists can not deadlock.
+    Does not commit.
+
+    Args:
+        db (AsyncSession): Session from database.
+        changes (Iterable[tuple[int | None, int, int]]): (task_list_id, total
+        change, completed change) of every changed task, lists may repeat.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for task_list_id, total, completed in changes:
+        if task_list_id:
+            deltas[task_list_id][0] += total
+            deltas[task_list_id][1] += completed
+    if not deltas:
+        return
+    ids = sorted(deltas)
+    changed = (
+        func.unnest(
+            literal(ids, ARRAY(Integer)),
+            literal([deltas[i][0] for i in ids], ARRAY(Integer)),
+            literal([deltas[i][1] for i in ids], ARRAY(Integer)),
+        )
+        .table_valued("task_list_id", "total", "completed")
+        .render_derived("changed")
+    )
+    locked = (
+        select(TaskList.id)
+        .where(ids_in(TaskList.id, ids))
+        .order_by(TaskList.id)
+        .with_for_update()
+        .cte("locked")
+    )
+    await db.execute(
+        update(TaskList)
+        .where(TaskList.id == locked.c.id, TaskList.id == changed.c.task_list_id)
+        .values(
+            total_tasks=TaskList.total_tasks + changed.c.total,
+            completed_tasks=TaskList.completed_tasks + changed.c.completed,
+            version=TaskList.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def filters_clause(filters: TaskFilter) -> ColumnElement:
+    """Build the SQL condition of task filters.
+
+    Args:
+        filters (TaskFilter): Filters to apply to tasks.
+
+    Returns:
+        ColumnElement: SQL condition, true when there are no filters.
+    """
+    conditions = []
+    if filters.status is not None:
+        conditions.append(Task.status == filters.status)
+    if filters.priority is not None:
+        conditions.append(Task.priority == filters.priority)
+    if filters.user_id is not None:
+        conditions.append(Task.user_id == filters.user_id)
+    if filters.task_list_id is not None:
+        conditions.append(Task.task_list_id == filters.task_list_id)
+    return and_(true(), *conditions)
 
 
 class TaskRepository:
     """Task class repository."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         """Constructor class method.
 
         Args:
-            db (Session): Session from database.
+            db (AsyncSession): Session from database.
         """
         self.db = db
 
-    def create(self, data: TaskCreate) -> Task:
+    async def create(self, data: TaskCreate) -> Task:
         """Task repository function to create.
 
         Args:
@@ -26,54 +204,364 @@ class TaskRepository:
         """
         task = Task(**data.model_dump())
         self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
+        await update_task_lists(self.db, [task_count(task.task_list_id, task.status)])
+        await self.db.commit()
+        await self.db.refresh(task)
         return task
 
-    def update(self, task_id: int, data: TaskUpdate) -> Task | None:
+    async def update(self, task_id: int, data: TaskUpdate) -> Row | None:
         """Task repository function to update.
 
+        Runs the single row version of bulk_update, one UPDATE ... RETURNING
+        that also returns the previous user in charge, so the assignment
+        notification is written to the outbox in the same transaction.
+
         Args:
             task_id (int): Task id.
             data (TaskUpdate): Schema to update task.
 
         Returns:
-            Task | None: Task instance if exists, otherwise None.
+            Row | None: Updated task row if exists, otherwise None.
         """
-        task = self.db.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return None
-        for key, value in data.model_dump(exclude_unset=True).items():
-            setattr(task, key, value)
-        self.db.commit()
-        self.db.refresh(task)
-        return task
+        rows = await self.bulk_update(data.model_dump(exclude_unset=True), [task_id])
+        return rows[0] if rows else None
 
-    def delete(self, task_id: int) -> bool:
+    async def delete(self, task_id: int) -> bool:
         """Task repository function to delete.
 
+        Runs one DELETE ... RETURNING, a missing task returns no row.
+
         Args:
             task_id (int): Task id.
 
         Returns:
             bool: True if deleted, False if not found.
         """
-        task = self.db.query(Task).filter(Task.id == task_id).first()
-        if not task:
-            return False
-        self.db.delete(task)
-        self.db.commit()
-        return True
+        return bool(await self.bulk_delete([task_id]))
+
+    async def list_page(
+        self, filters: TaskFilter, limit: int | None, after_id: int | None = None
+    ) -> list[Row]:
+        """List a page of tasks ordered by id (keyset pagination).
+
+        Only the task columns are selected, the rows are not ORM objects so
+        they skip the identity map and instance state.
+
+        Args:
+            filters (TaskFilter): Filters to apply to tasks.
+            limit (int | None): Max number of tasks to return, None for no limit.
+            after_id (int | None, optional): Return tasks with id greater than
+            this one. Defaults to None.
+
+        Returns:
+            list[Row]: Page of task rows.
+        """
+        query = select(*TASK_COLUMNS).where(filters_clause(filters))
+        if after_id is not None:
+            query = query.where(Task.id > after_id)
+        result = await self.db.execute(query.order_by(Task.id).limit(limit))
+        return list(result.all())
+
+    async def stream(
+        self, filters: TaskFilter, batch_size: int
+    ) -> AsyncIterator[list[Row]]:
+        """Stream the task rows ordered by id with a server side cursor.
+
+        Only batch_size rows are held in memory at a time, whatever the number
+        of matching tasks.
+
+        Args:
+            filters (TaskFilter): Filters to apply to tasks.
+            batch_size (int): Number of rows fetched per round trip.
+
+        Yields:
+            AsyncIterator[list[Row]]: Batches of task rows.
+        """
+        result = await self.db.stream(
+            select(*TASK_COLUMNS)
+            .where(filters_clause(filters))
+            .order_by(Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def search_page(
+        self,
+        tsquery: str,
+        filters: TaskFilter,
+        limit: int,
+        after: tuple[float, int] | None = None,
+    ) -> list[Row]:
+        """Search a page of tasks by text, ordered by rank and id.
+
+        Matches are found with the GIN index of the search vector and ranked
+        with ts_rank_cd, pages continue after the (rank, id) of the last row.
+
+        Args:
+            tsquery (str): Query in to_tsquery syntax.
+            filters (TaskFilter): Filters to apply to tasks.
+            limit (int): Max number of tasks to return.
+            after (tuple[float, int] | None, optional): Rank and id of the last
+            task of the previous page. Defaults to None.
+
+        Returns:
+            list[Row]: Task rows with a rank column.
+        """
+        query = func.to_tsquery("simple", tsquery)
+        rank = func.ts_rank_cd(Task.search_vector, query)
+        statement = select(*TASK_COLUMNS, rank.label("rank")).where(
+            Task.search_vector.bool_op("@@")(query), filters_clause(filters)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            statement = statement.where(
+                or_(rank < after_rank, and_(rank == after_rank, Task.id > after_id))
+            )
+        result = await self.db.execute(
+            statement.order_by(rank.desc(), Task.id).limit(limit)
+        )
+        return list(result.all())
+
+    async def list_by_task_lists(self, task_list_ids: list[int]) -> list[Row]:
+        """List the task rows of several task lists in one query.
+
+        Args:
+            task_list_ids (list[int]): Task list ids.
+
+        Returns:
+            list[Row]: Task rows ordered by task list id and id.
+        """
+        result = await self.db.execute(
+            select(*TASK_COLUMNS)
+            .where(ids_in(Task.task_list_id, task_list_ids))
+            .order_by(Task.task_list_id, Task.id)
+        )
+        return list(result.all())
 
-    def list_all(self) -> list[Task]:
-        """List all tasks.
+    async def add_many(self, data: list[TaskCreate]) -> list[Row]:
+        """Insert many tasks with multi-row INSERT ... RETURNING statements.
+
+        Does not commit, so it can be part of a bigger transaction.
+
+        Args:
+            data (list[TaskCreate]): Schemas to create tasks.
 
         Returns:
-            list[Task]: List of all tasks.
+            list[Row]: Inserted task rows, in the same order as data.
         """
-        return self.db.query(Task).all()
+        if not data:
+            return []
+        result = await self.db.execute(
+            insert(Task).returning(*TASK_COLUMNS, sort_by_parameter_order=True),
+            [task.model_dump() for task in data],
+        )
+        rows = list(result.all())
+        await update_task_lists(
+            self.db, (task_count(row.task_list_id, row.status) for row in rows)
+        )
+        return rows
+
+    async def copy_import(self, records: list[tuple]) -> tuple[int, list[Row]]:
+        """Load an import batch with COPY into a staging table, then insert it.
+
+        Rows whose user or task list does not exist are not inserted, they are
+        returned to report them. Commits the batch.
+
+        Args:
+            records (list[tuple]): (line, user_id, task_list_id, description,
+            status name, priority name) of the validated rows.
 
-    def get_by_id(self, task_id: int) -> Task | None:
+        Returns:
+            tuple[int, list[Row]]: Number of inserted tasks and the (line,
+            user_id, task_list_id, missing_user, missing_task_list) rows that
+            were rejected.
+        """
+        await self.db.execute(CreateTable(task_import))
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            task_import.name,
+            records=records,
+            columns=[column.name for column in task_import.columns],
+        )
+
+        missing_user = and_(task_import.c.user_id.is_not(None), User.id.is_(None))
+        missing_task_list = and_(
+            task_import.c.task_list_id.is_not(None), TaskList.id.is_(None)
+        )
+        staged = (
+            select(task_import)
+            .outerjoin(User, User.id == task_import.c.user_id)
+            .outerjoin(TaskList, TaskList.id == task_import.c.task_list_id)
+        )
+        rejected = await self.db.execute(
+            staged.with_only_columns(
+                task_import.c.line,
+                task_import.c.user_id,
+                task_import.c.task_list_id,
+                missing_user.label("missing_user"),
+                missing_task_list.label("missing_task_list"),
+            )
+            .where(or_(missing_user, missing_task_list))
+            .order_by(task_import.c.line)
+        )
+        rejected_rows = list(rejected.all())
+
+        result = await self.db.execute(
+            insert(Task)
+            .from_select(
+                ["user_id", "task_list_id", "description", "status", "priority"],
+                staged.with_only_columns(
+                    task_import.c.user_id,
+                    task_import.c.task_list_id,
+                    task_import.c.description,
+                    cast(task_import.c.status, Task.status.type),
+                    cast(task_import.c.priority, Task.priority.type),
+                )
+                .where(~missing_user, ~missing_task_list)
+                .order_by(task_import.c.line),
+            )
+            .returning(Task.task_list_id, Task.status)
+        )
+        inserted = list(result.all())
+        await update_task_lists(
+            self.db, (task_count(row.task_list_id, row.status) for row in inserted)
+        )
+        await self.db.commit()
+        return len(inserted), rejected_rows
+
+    async def create_many(self, data: list[TaskCreate]) -> list[Row]:
+        """Task repository function to create many tasks in one transaction.
+
+        Args:
+            data (list[TaskCreate]): Schemas to create tasks.
+
+        Returns:
+            list[Row]: Created task rows, in the same order as data.
+        """
+        rows = await self.add_many(data)
+        await self.db.commit()
+        return rows
+
+    async def bulk_update(
+        self,
+        values: dict,
+        ids: list[int] | None = None,
+        filters: TaskFilter | None = None,
+    ) -> list[Row]:
+        """Update the tasks selected by ids or filters in one statement.
+
+        Runs UPDATE ... FROM a CTE of the previous rows ... RETURNING, so the
+        previous user in charge, task list and status of every task are
+        returned as well. The CTE locks the tasks in id order and then
+        update_task_lists locks their lists in id order, so overlapping bulk
+        requests take their locks in the same order. Tasks whose user in charge
+        changed get their assignment notification written to the outbox in the
+        same transaction.
+
+        Args:
+            values (dict): Columns to update.
+            ids (list[int] | None, optional): Ids of the tasks. Defaults to None.
+            filters (TaskFilter | None, optional): Filters to select the tasks
+            when ids are not sent. Defaults to None.
+
+        Returns:
+            list[Row]: Updated task rows with previous_user_id,
+            previous_task_list_id and previous_status columns.
+        """
+        selection = ids_in(Task.id, ids) if ids is not None else filters_clause(filters)
+        previous = (
+            select(Task.id, Task.user_id, Task.task_list_id, Task.status)
+            .where(selection)
+            .order_by(Task.id)
+            .with_for_update()
+            .cte("previous")
+        )
+        result = await self.db.execute(
+            update(Task)
+            .where(Task.id == previous.c.id)
+            .values(**values, version=Task.version + 1)
+            .returning(
+                *TASK_COLUMNS,
+                previous.c.user_id.label("previous_user_id"),
+                previous.c.task_list_id.label("previous_task_list_id"),
+                previous.c.status.label("previous_status"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result.all())
+        await update_task_lists(
+            self.db,
+            (
+                change
+                for row in rows
+                for change in (
+                    task_count(row.previous_task_list_id, row.previous_status, -1),
+                    task_count(row.task_list_id, row.status),
+                )
+            ),
+        )
+        await NotificationRepository(self.db).enqueue(
+            [
+                assignment_notification(row.user_id, row.id)
+                for row in rows
+                if row.user_id and row.user_id != row.previous_user_id
+            ]
+        )
+        await self.db.commit()
+        return rows
+
+    async def bulk_delete(
+        self, ids: list[int] | None = None, filters: TaskFilter | None = None
+    ) -> list[int]:
+        """Delete the tasks selected by ids or filters in one statement.
+
+        Runs DELETE ... USING a CTE that locks the tasks in id order, then
+        the counters of their lists are updated, locking the lists in id order
+        as bulk_update does.
+
+        Args:
+            ids (list[int] | None, optional): Ids of the tasks. Defaults to None.
+            filters (TaskFilter | None, optional): Filters to select the tasks
+            when ids are not sent. Defaults to None.
+
+        Returns:
+            list[int]: Ids of the deleted tasks.
+        """
+        selection = ids_in(Task.id, ids) if ids is not None else filters_clause(filters)
+        locked = (
+            select(Task.id)
+            .where(selection)
+            .order_by(Task.id)
+            .with_for_update()
+            .cte("locked")
+        )
+        result = await self.db.execute(
+            delete(Task)
+            .where(Task.id == locked.c.id)
+            .returning(Task.id, Task.task_list_id, Task.status)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result.all())
+        await update_task_lists(
+            self.db, (task_count(row.task_list_id, row.status, -1) for row in rows)
+        )
+        await self.db.commit()
+        return [row.id for row in rows]
+
+    async def get_version(self, task_id: int) -> int | None:
+        """Get the row version of a task without loading it.
+
+        Args:
+            task_id (int): Task id.
+
+        Returns:
+            int | None: Task version if exists, otherwise None.
+        """
+        return await self.db.scalar(select(Task.version).where(Task.id == task_id))
+
+    async def get_by_id(self, task_id: int) -> Task | None:
         """Task repository function to get task by id.
 
         Args:
@@ -82,21 +570,21 @@ class TaskRepository:
         Returns:
             Task | None: Task instance if exists, otherwise None.
         """
-        return self.db.query(Task).filter(Task.id == task_id).first()
+        return await self.db.scalar(select(Task).where(Task.id == task_id))
 
 
 class TaskListRepository:
     """TaskList class repository."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         """Constructor class method.
 
         Args:
-            db (Session): Session from database.
+            db (AsyncSession): Session from database.
         """
         self.db = db
 
-    def create(self, data: TaskListCreate) -> TaskList:
+    async def create(self, data: TaskListCreate) -> TaskList:
         """TaskList repository function to create.
 
         Args:
@@ -107,11 +595,38 @@ class TaskListRepository:
         """
         task_list = TaskList(**data.model_dump())
         self.db.add(task_list)
-        self.db.commit()
-        self.db.refresh(task_list)
+        await self.db.commit()
+        await self.db.refresh(task_list)
         return task_list
 
-    def update(self, list_id: int, data: TaskListUpdate) -> TaskList | None:
+    async def create_with_tasks(
+        self, data: TaskListCreate, tasks: list[TaskCreate]
+    ) -> tuple[TaskList, list[Row]]:
+        """TaskList repository function to create a list and its tasks.
+
+        The list and all its tasks are inserted in a single transaction, tasks
+        with multi-row INSERT ... RETURNING statements.
+
+        Args:
+            data (TaskListCreate): Schema to create task list.
+            tasks (list[TaskCreate]): Schemas to create the tasks of the list.
+
+        Returns:
+            tuple[TaskList, list[Row]]: TaskList instance and the inserted task
+            rows, in the same order as tasks.
+        """
+        task_list = TaskList(**data.model_dump())
+        self.db.add(task_list)
+        await self.db.flush()
+
+        for task in tasks:
+            task.task_list_id = task_list.id
+        rows = await TaskRepository(self.db).add_many(tasks)
+
+        await self.db.commit()
+        return task_list, rows
+
+    async def update(self, list_id: int, data: TaskListUpdate) -> TaskList | None:
         """TaskList repository function to update.
 
         Args:
@@ -121,16 +636,17 @@ class TaskListRepository:
         Returns:
             TaskList | None: TaskList instance if exists, otherwise None.
         """
-        task_list = self.db.query(TaskList).filter(TaskList.id == list_id).first()
+        task_list = await self.db.scalar(select(TaskList).where(TaskList.id == list_id))
         if not task_list:
             return None
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(task_list, key, value)
-        self.db.commit()
-        self.db.refresh(task_list)
+        task_list.version = TaskList.version + 1
+        await self.db.commit()
+        await self.db.refresh(task_list)
         return task_list
 
-    def delete(self, list_id: int) -> bool:
+    async def delete(self, list_id: int) -> bool:
         """TaskList repository function to delete.
 
         Args:
@@ -139,22 +655,139 @@ class TaskListRepository:
         Returns:
             bool: True if deleted, False if not found.
         """
-        task_list = self.db.query(TaskList).filter(TaskList.id == list_id).first()
+        task_list = await self.db.scalar(select(TaskList).where(TaskList.id == list_id))
         if not task_list:
             return False
-        self.db.delete(task_list)
-        self.db.commit()
+        await self.db.delete(task_list)
+        await self.db.commit()
         return True
 
-    def list_all(self) -> list[TaskList]:
-        """List all task lists with their tasks.
+    def _with_completeness_query(self) -> Select:
+        """Query task lists with their percentage of completeness.
+
+        The percentage is computed from the maintained task counters of the
+        lists, tasks are not read.
+
+        Returns:
+            Select: Query of (id, name, percentage_of_completeness) rows.
+        """
+        percentage = func.coalesce(
+            cast(TaskList.completed_tasks, Float)
+            * 100
+            / func.nullif(TaskList.total_tasks, 0),
+            0.0,
+        )
+        return select(
+            TaskList.id,
+            TaskList.name,
+            percentage.label("percentage_of_completeness"),
+        )
+
+    async def list_with_completeness(self) -> list[Row]:
+        """List all task lists with their percentage of completeness.
+
+        Returns:
+            list[Row]: Rows of id, name and percentage_of_completeness,
+            ordered by id.
+        """
+        result = await self.db.execute(
+            self._with_completeness_query().order_by(TaskList.id)
+        )
+        return list(result.all())
+
+    async def get_with_completeness(self, task_list_id: int) -> Row | None:
+        """Get task list by id with its percentage of completeness.
+
+        Args:
+            task_list_id (int): TaskList id.
+
+        Returns:
+            Row | None: Row of id, name and percentage_of_completeness if
+            exists, otherwise None.
+        """
+        result = await self.db.execute(
+            self._with_completeness_query().where(TaskList.id == task_list_id)
+        )
+        return result.first()
+
+    async def reconcile_counters(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> tuple[int | None, list[int]]:
+        """Recount the tasks of a batch of task lists and repair drifted counters.
+
+        The lists are locked before counting, task writers update the list row
+        in their transaction, so no task change can be missed or counted twice.
+
+        Args:
+            after_id (int, optional): Reconcile lists with greater id.
+            Defaults to 0.
+            limit (int, optional): Number of lists of the batch. Defaults to 1000.
 
         Returns:
-            list[TaskList]: List all task lists with their tasks.
+            tuple[int | None, list[int]]: Last id of the batch, None when there
+            are no more lists, and the ids of the repaired lists.
         """
-        return self.db.query(TaskList).options(selectinload(TaskList.tasks)).all()
+        locked = list(
+            await self.db.scalars(
+                select(TaskList.id)
+                .where(TaskList.id > after_id)
+                .order_by(TaskList.id)
+                .limit(limit)
+                .with_for_update()
+            )
+        )
+        if not locked:
+            await self.db.commit()
+            return None, []
+
+        actual = (
+            select(
+                TaskList.id,
+                func.count(Task.id).label("total"),
+                func.count(Task.id)
+                .filter(Task.status == TaskStatusEnum.COMPLETED)
+                .label("completed"),
+            )
+            .outerjoin(Task, Task.task_list_id == TaskList.id)
+            .where(ids_in(TaskList.id, locked))
+            .group_by(TaskList.id)
+            .subquery("actual")
+        )
+        result = await self.db.execute(
+            update(TaskList)
+            .where(
+                TaskList.id == actual.c.id,
+                or_(
+                    TaskList.total_tasks != actual.c.total,
+                    TaskList.completed_tasks != actual.c.completed,
+                ),
+            )
+            .values(
+                total_tasks=actual.c.total,
+                completed_tasks=actual.c.completed,
+                version=TaskList.version + 1,
+            )
+            .returning(TaskList.id)
+            .execution_options(synchronize_session=False)
+        )
+        repaired = list(result.scalars())
+        await self.db.commit()
+        return locked[-1], repaired
+
+    async def get_version(self, task_list_id: int) -> int | None:
+        """Get the row version of a task list without loading it.
+
+        Args:
+            task_list_id (int): TaskList id.
+
+        Returns:
+            int | None: TaskList version if exists, otherwise None.
+        """
+        return await self.db.scalar(
+            select(TaskList.version).where(TaskList.id == task_list_id)
+        )
 
-    def get_by_id(self, task_list_id: int) -> TaskList | None:
+    async def get_by_id(self, task_list_id: int) -> TaskList | None:
         """TaskList repository function to get task list by id.
 
         Args:
@@ -163,10 +796,9 @@ class TaskListRepository:
         Returns:
             TaskList | None: TaskList instance if exists, otherwise None.
         """
-        task_list = (
-            self.db.query(TaskList)
+        task_list = await self.db.scalar(
+            select(TaskList)
             .options(selectinload(TaskList.tasks))
-            .filter(TaskList.id == task_list_id)
-            .first()
+            .where(TaskList.id == task_list_id)
         )
         return task_list
@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import principal_cache
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -6,15 +8,15 @@ from app.schemas.user import UserCreate, UserUpdate
 class UserRepository:
     """User class repository."""
 
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: AsyncSession) -> None:
         """Constructor class method.
 
         Args:
-            db (Session): Session from database.
+            db (AsyncSession): Session from database.
         """
         self.db = db
 
-    def create(self, data: UserCreate) -> User:
+    async def create(self, data: UserCreate) -> User:
         """User repository function to create.
 
         Args:
@@ -25,13 +27,15 @@ class UserRepository:
         """
         user = User(**data.model_dump())
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def update(self, user_id: int, data: UserUpdate) -> User | None:
+    async def update(self, user_id: int, data: UserUpdate) -> User | None:
         """User repository function to update.
 
+        The user is removed from the authenticated users cache.
+
         Args:
             user_id (int): User id.
             data (UserUpdate): Schema to update user.
@@ -39,32 +43,51 @@ class UserRepository:
         Returns:
             User | None: User instance if user exits or None if not.
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.get_user_by_id(user_id)
         if not user:
             return None
-        for key, value in data.items():
+        for key, value in data.model_dump(exclude_unset=True).items():
             setattr(user, key, value)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        principal_cache.invalidate(str(user_id))
+        await self.db.refresh(user)
         return user
 
-    def delete(self, user_id: int) -> bool:
+    async def update_password(self, user_id: int, password: str) -> None:
+        """User repository function to replace the password hash.
+
+        Args:
+            user_id (int): User id.
+            password (str): New password hash.
+        """
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(password=password)
+            .execution_options(synchronize_session="fetch")
+        )
+        await self.db.commit()
+
+    async def delete(self, user_id: int) -> bool:
         """User repository function to delete.
 
+        The user is removed from the authenticated users cache.
+
         Args:
             user_id (int): User id.
 
         Returns:
             bool: If user was deleted
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.get_user_by_id(user_id)
         if not user:
             return None
-        self.db.delete(user)
-        self.db.commit()
+        await self.db.delete(user)
+        await self.db.commit()
+        principal_cache.invalidate(str(user_id))
         return True
 
-    def get_user_by_id(self, user_id: int) -> User | None:
+    async def get_user_by_id(self, user_id: int) -> User | None:
         """User repository function to get user by id.
 
         Args:
@@ -73,9 +96,9 @@ class UserRepository:
         Returns:
             User | None: User instance if user exits or None if not.
         """
-        return self.db.query(User).filter(User.id == user_id).first()
+        return await self.db.scalar(select(User).where(User.id == user_id))
 
-    def get_user_by_email(self, user_email: str) -> User | None:
+    async def get_user_by_email(self, user_email: str) -> User | None:
         """User repository function to get user by email.
 
         Args:
@@ -84,4 +107,4 @@ class UserRepository:
         Returns:
             User | None: User instance if user exits or None if not.
         """
-        return self.db.query(User).filter(User.email == user_email).first()
+        return await self.db.scalar(select(User).where(User.email == user_email))
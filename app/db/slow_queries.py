@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.enums.general_enums import SlowQueryOrder
+from app.core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# EXPLAIN ANALYZE runs the statement again, captures beyond this many are
+# skipped so a burst of slow queries does not double the database load.
+MAX_PENDING_EXPLAINS = 2
+# Execution option of the capture connections, their statements are not timed.
+CAPTURE_OPTION = "slow_query_capture"
+
+_ROW = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_NORMALIZE = (
+    # String literals, then asyncpg ($1::TYPE) and psycopg2 (%(name)s) params.
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\$\d+(?:::[\w\[\]]+(?:\(\d+\))?)?|%\(\w+\)s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # Multi row VALUES and IN lists of any length.
+    (re.compile(rf"{_ROW}(?:\s*,\s*{_ROW})+"), "(...)"),
+    (re.compile(rf"\bIN\s*{_ROW}", re.IGNORECASE), "IN (...)"),
+    (re.compile(r"\s+"), " "),
+)
+_READ_ONLY = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|MERGE|FOR\s+(?:NO\s+KEY\s+)?UPDATE|FOR\s+SHARE)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize(statement: str) -> str:
+    """Replace the literals and bound parameters of a statement with ?.
+
+    Statements that differ only in their parameters, the length of IN lists or
+    the number of VALUES rows normalize to the same text.
+
+    Args:
+        statement (str): SQL sent to the driver.
+
+    Returns:
+        str: Normalized statement on one line.
+    """
+    for pattern, replacement in _NORMALIZE:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    """Get a short stable id of a normalized statement.
+
+    Args:
+        normalized (str): Statement from normalize.
+
+    Returns:
+        str: Hex fingerprint.
+    """
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def is_explainable(statement: str) -> bool:
+    """Check a statement can run again under EXPLAIN ANALYZE without effects.
+
+    Args:
+        statement (str): SQL sent to the driver.
+
+    Returns:
+        bool: True for plain SELECT statements, without writes or row locks.
+    """
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+class SlowQueryLog:
+    """Log of the statements slower than a threshold, with sampled plans.
+
+    Slow statements are logged and kept in a ring buffer, by fingerprint and
+    without their parameter values. A sample of the slow SELECT statements is
+    run again with EXPLAIN (ANALYZE, BUFFERS) on a separate connection, in a
+    transaction that is rolled back, and the plan is attached to the entry.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain_rate: float,
+        size: int,
+        path: str | None = None,
+    ) -> None:
+        """Constructor class method.
+
+        Args:
+            threshold_ms (float): Statements that take longer are logged.
+            explain_rate (float): Fraction of the slow SELECT statements whose
+            plan is captured, 0 disables the captures.
+            size (int): Max number of entries kept in memory.
+            path (str | None, optional): File where entries are appended as
+            JSON lines. Defaults to None.
+        """
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate
+        self.path = path
+        self.entries: deque[dict] = deque(maxlen=size)
+        self._lock = Lock()
+        self._pending = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="explain")
+
+    def watch(self, engine: Engine, async_engine: AsyncEngine | None = None) -> None:
+        """Time the statements of an engine.
+
+        Args:
+            engine (Engine): Sync engine, the sync_engine of async engines.
+            async_engine (AsyncEngine | None, optional): Async engine of
+            engine, used to capture the plans. Defaults to None.
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_query(conn, cursor, statement, parameters, context, executemany):
+            if context is not None and not context.execution_options.get(
+                CAPTURE_OPTION
+            ):
+                context._slow_query_started_at = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def end_query(conn, cursor, statement, parameters, context, executemany):
+            started_at = getattr(context, "_slow_query_started_at", None)
+            if started_at is None:
+                return
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            if elapsed_ms >= self.threshold_ms:
+                self.record(
+                    statement,
+                    None if executemany else parameters,
+                    elapsed_ms,
+                    async_engine or engine,
+                )
+
+    def record(
+        self,
+        statement: str,
+        parameters,
+        elapsed_ms: float,
+        engine: Engine | AsyncEngine,
+    ) -> dict:
+        """Log a slow statement and maybe capture its plan.
+
+        Args:
+            statement (str): SQL sent to the driver.
+            parameters: Driver parameters, None for executemany. They are only
+            used to run the EXPLAIN, never stored.
+            elapsed_ms (float): Statement duration.
+            engine (Engine | AsyncEngine): Engine to run the EXPLAIN.
+
+        Returns:
+            dict: Log entry.
+        """
+        normalized = normalize(statement)
+        entry = {
+            "fingerprint": fingerprint(normalized),
+            "statement": normalized,
+            "duration_ms": round(elapsed_ms, 3),
+            "at": datetime.now(timezone.utc).isoformat(),
+            "plan": None,
+        }
+        logger.warning(
+            "Slow query %s took %.1f ms: %s",
+            entry["fingerprint"],
+            elapsed_ms,
+            normalized,
+        )
+        self.entries.append(entry)
+
+        capture = (
+            parameters is not None
+            and random.random() < self.explain_rate
+            and is_explainable(statement)
+        )
+        if capture:
+            with self._lock:
+                capture = self._pending < MAX_PENDING_EXPLAINS
+                self._pending += capture
+        if capture:
+            if isinstance(engine, AsyncEngine):
+                task = asyncio.get_running_loop().create_task(
+                    self._explain_async(engine, statement, parameters, entry)
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                self._executor.submit(
+                    self._explain_sync, engine, statement, parameters, entry
+                )
+        else:
+            self._write(entry)
+        return entry
+
+    async def _explain_async(
+        self, engine: AsyncEngine, statement: str, parameters, entry: dict
+    ) -> None:
+        """Capture the plan of a statement of an async engine."""
+        try:
+            async with engine.connect() as conn:
+                await conn.execution_options(**{CAPTURE_OPTION: True})
+                await conn.exec_driver_sql(self._explain_timeout())
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                entry["plan"] = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception:
+            logger.exception("Plan capture of query %s failed", entry["fingerprint"])
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._write(entry)
+
+    def _explain_sync(
+        self, engine: Engine, statement: str, parameters, entry: dict
+    ) -> None:
+        """Capture the plan of a statement of a sync engine."""
+        try:
+            with engine.connect() as conn:
+                conn.execution_options(**{CAPTURE_OPTION: True})
+                conn.exec_driver_sql(self._explain_timeout())
+                result = conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                entry["plan"] = "\n".join(row[0] for row in result)
+                conn.rollback()
+        except Exception:
+            logger.exception("Plan capture of query %s failed", entry["fingerprint"])
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._write(entry)
+
+    @staticmethod
+    def _explain_timeout() -> str:
+        """Statement that bounds the EXPLAIN ANALYZE of the capture transaction."""
+        timeout = int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)
+        return f"SET LOCAL statement_timeout = {timeout}"
+
+    def _write(self, entry: dict) -> None:
+        """Append an entry to the log file, if there is one."""
+        if not self.path:
+            return
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(line)
+
+    async def wait_explains(self) -> None:
+        """Wait for the pending plan captures of the async engines."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def top(
+        self, limit: int = 10, order: SlowQueryOrder = SlowQueryOrder.MAX
+    ) -> list[dict]:
+        """Aggregate the entries in memory by fingerprint.
+
+        Args:
+            limit (int, optional): Max number of fingerprints. Defaults to 10.
+            order (SlowQueryOrder, optional): Sort by max, mean or total
+            duration, descending. Defaults to SlowQueryOrder.MAX.
+
+        Returns:
+            list[dict]: Statement, count, total, mean and max duration, last
+            time seen and latest captured plan of each fingerprint.
+        """
+        stats = {}
+        for entry in list(self.entries):
+            item = stats.get(entry["fingerprint"])
+            if item is None:
+                item = stats[entry["fingerprint"]] = {
+                    "fingerprint": entry["fingerprint"],
+                    "statement": entry["statement"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "plan": None,
+                }
+            item["count"] += 1
+            item["total_ms"] += entry["duration_ms"]
+            item["max_ms"] = max(item["max_ms"], entry["duration_ms"])
+            item["last_seen"] = entry["at"]
+            item["plan"] = entry["plan"] or item["plan"]
+        for item in stats.values():
+            item["total_ms"] = round(item["total_ms"], 3)
+            item["mean_ms"] = round(item["total_ms"] / item["count"], 3)
+        key = f"{SlowQueryOrder(order).value}_ms"
+        return sorted(stats.values(), key=lambda item: item[key], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        """Remove the entries in memory."""
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_EXPLAIN_RATE,
+    settings.SLOW_QUERY_BUFFER_SIZE,
+    settings.SLOW_QUERY_LOG_FILE,
+)
@@ -31,3 +31,20 @@ class EmailAlreadyExists(Exception):
         self.email = email
         self.message = f"The User with email:{self.email} already exits."
         super().__init__(self.email)
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor can not be decoded."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.message = f"The cursor:{self.cursor} is not valid."
+        super().__init__(self.message)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+    def __init__(self):
+        self.message = "Too many password operations in progress, try again."
+        super().__init__(self.message)
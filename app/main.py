@@ -1,7 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from app.api.routes import auth, task
+from app.api.routes import admin, auth, metrics, task
+from app.core.request_metrics import RequestMetricsMiddleware
+from app.core.settings import settings
+from app.db.session import AsyncSessionLocal
+from app.services.notification import SENDERS, NotificationDispatcher
+from app.services.password import shutdown_executor
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the notification dispatcher and release the resources on shutdown."""
+    dispatcher_task = None
+    if settings.NOTIFICATION_DISPATCHER_ENABLED:
+        sender = SENDERS[settings.NOTIFICATION_SENDER]()
+        dispatcher = NotificationDispatcher(AsyncSessionLocal, sender)
+        dispatcher_task = asyncio.create_task(dispatcher.run())
+    yield
+    if dispatcher_task is not None:
+        dispatcher_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await dispatcher_task
+    shutdown_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(task.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
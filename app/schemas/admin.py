@@ -0,0 +1,23 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class SlowQueryStats(BaseModel):
+    """Schema for the slow executions of a statement fingerprint."""
+
+    fingerprint: str = Field(
+        ..., description="Id of the normalized statement", example="9f2c1e7a5b3d4c60"
+    )
+    statement: str = Field(
+        ...,
+        description="Statement with its literals and parameters replaced by ?",
+        example="SELECT tasks.id FROM tasks WHERE tasks.task_list_id = ? LIMIT ?",
+    )
+    count: int = Field(..., description="Slow executions in the log", example=3)
+    total_ms: float = Field(..., description="Time of the slow executions")
+    mean_ms: float = Field(..., description="Mean time of the slow executions")
+    max_ms: float = Field(..., description="Time of the slowest execution")
+    last_seen: str = Field(..., description="ISO time of the last slow execution")
+    plan: Optional[str] = Field(
+        None, description="Latest EXPLAIN (ANALYZE, BUFFERS) output, if captured"
+    )
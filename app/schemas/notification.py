@@ -0,0 +1,17 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class NotificationMessage(BaseModel):
+    """Schema of an outbox notification handed to a sender."""
+
+    id: int = Field(..., description="Outbox notification id", example=1)
+    kind: str = Field(
+        ..., description="Type of notification", example="task_assignment"
+    )
+    dedup_key: str = Field(
+        ..., description="Key of the notified event", example="task_assignment:4:2"
+    )
+    payload: dict = Field(..., description="Notification data")
+    attempts: int = Field(..., description="Delivery attempts, this one included")
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,19 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from pydantic import (
+    BaseModel,
+    Field,
+    ConfigDict,
+    TypeAdapter,
+    field_validator,
+    model_validator,
+)
+from typing import Annotated, Optional
 from app.core.enums.general_enums import PriorityEnum, TaskStatusEnum
+from app.core.pagination import MAX_PAGE_SIZE
+
+
+MAX_BULK_SIZE = 10_000
+# Ids are Postgres integer columns, larger values would fail in the driver.
+RowId = Annotated[int, Field(ge=1, le=2_147_483_647)]
 
 
 class TaskBase(BaseModel):
@@ -82,6 +95,9 @@ class TaskRead(TaskBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+TASK_READ_LIST = TypeAdapter(list[TaskRead])
+
+
 class TaskListBase(BaseModel):
     """Base schema for a task list."""
 
@@ -132,6 +148,10 @@ class TaskListRead(TaskListBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+TASK_LIST_READ = TypeAdapter(TaskListRead)
+TASK_LIST_READ_LIST = TypeAdapter(list[TaskListRead])
+
+
 class TaskListWithTasks(BaseModel):
     """Schema for task list with tasks"""
 
@@ -159,14 +179,161 @@ class TaskListWithTasks(BaseModel):
 
 
 class TaskListFilter(BaseModel):
-    """Schema for filtering tasks in a task list."""
+    """Schema for filtering and paginating tasks in a task list."""
 
     status: Optional[TaskStatusEnum] = Field(
-        None, description="Filter tasks by status", example=True
+        None, description="Filter tasks by status", example="completed"
     )
 
-    priority: Optional[str] = Field(
+    priority: Optional[PriorityEnum] = Field(
         None,
         description="Filter tasks by priority (e.g., low, medium, high)",
         example="high",
     )
+
+    limit: Optional[int] = Field(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Max number of tasks to return, all tasks if not sent",
+        example=100,
+    )
+
+    after: Optional[str] = Field(
+        None, description="Cursor from the X-Next-Cursor header", example=None
+    )
+
+
+class TaskFilter(BaseModel):
+    """Schema for filtering tasks."""
+
+    status: Optional[TaskStatusEnum] = Field(
+        None, description="Filter tasks by status", example="pending"
+    )
+    priority: Optional[PriorityEnum] = Field(
+        None, description="Filter tasks by priority", example="high"
+    )
+    user_id: Optional[int] = Field(
+        None, description="Filter tasks by user ID in charge", example=123
+    )
+    task_list_id: Optional[int] = Field(
+        None, description="Filter tasks by task list ID", example=456
+    )
+
+
+class TaskBulkSelection(BaseModel):
+    """Schema to select the tasks of a bulk operation by ids or by filters."""
+
+    ids: Optional[list[RowId]] = Field(
+        None,
+        min_length=1,
+        max_length=MAX_BULK_SIZE,
+        description="Ids of the tasks",
+        example=[1, 2, 3],
+    )
+    filters: Optional[TaskFilter] = Field(
+        None,
+        description="Filters to select the tasks, used when ids are not sent",
+        example={"task_list_id": 456, "status": "pending"},
+    )
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "TaskBulkSelection":
+        """Validate that the tasks are selected by ids or by non empty filters."""
+        if (self.ids is None) == (self.filters is None):
+            raise ValueError("Send either ids or filters")
+        if self.filters is not None and not self.filters.model_dump(exclude_none=True):
+            raise ValueError("Filters must have at least one value")
+        return self
+
+
+class TaskBulkStatusUpdate(TaskBulkSelection):
+    """Schema for update status from many tasks"""
+
+    status: TaskStatusEnum = Field(
+        ..., description="Updated task status", example="completed"
+    )
+
+
+class TaskBulkInChargeUpdate(TaskBulkSelection):
+    """Schema for update in charge from many tasks"""
+
+    user_id: RowId = Field(
+        ..., description="Updated user ID in charge of the tasks", example=123
+    )
+
+
+class TaskBulkCreate(BaseModel):
+    """Schema for creating many tasks."""
+
+    tasks: list[TaskCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_SIZE,
+        description="Tasks to create",
+        example=[
+            {"task_list_id": 456, "description": "Task 1", "priority": "low"},
+            {"task_list_id": 456, "description": "Task 2", "priority": "high"},
+        ],
+    )
+
+
+class TaskBulkResult(BaseModel):
+    """Schema for returning the result of a bulk create or update."""
+
+    tasks: list[TaskRead] = Field(..., description="Created or updated tasks")
+    missing_ids: list[int] = Field(
+        [], description="Requested ids that do not exist", example=[4]
+    )
+
+
+class TaskBulkDeleteResult(BaseModel):
+    """Schema for returning the result of a bulk delete."""
+
+    deleted_ids: list[int] = Field(
+        ..., description="Ids of the deleted tasks", example=[1, 2, 3]
+    )
+    missing_ids: list[int] = Field(
+        [], description="Requested ids that do not exist", example=[4]
+    )
+
+
+class TaskImportRow(TaskCreate):
+    """Schema of a row of a tasks import, validated before it is copied."""
+
+    user_id: Optional[int] = Field(
+        None, ge=1, le=2_147_483_647, description="User ID in charge of the task"
+    )
+    task_list_id: Optional[int] = Field(
+        None, ge=1, le=2_147_483_647, description="Task list ID"
+    )
+    status: TaskStatusEnum = Field(
+        TaskStatusEnum.PENDING, description="Task status", example="pending"
+    )
+
+    @field_validator("description")
+    @classmethod
+    def description_without_nul(cls, description: str) -> str:
+        """Reject NUL characters, Postgres text can not store them."""
+        if "\x00" in description:
+            raise ValueError("NUL characters are not allowed")
+        return description
+
+
+class TaskImportError(BaseModel):
+    """Schema for a row rejected by a tasks import."""
+
+    line: int = Field(..., description="Line of the row in the file", example=12)
+    error: str = Field(
+        ..., description="Why the row was rejected", example="User 7 does not exist"
+    )
+
+
+class TaskImportResult(BaseModel):
+    """Schema for returning the result of a tasks import."""
+
+    imported: int = Field(..., description="Number of imported tasks", example=998)
+    failed: int = Field(..., description="Number of rejected rows", example=2)
+    errors: list[TaskImportError] = Field(
+        [], description="Rejected rows, the first MAX_IMPORT_ERRORS of them"
+    )
@@ -1,12 +1,14 @@
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from app.db.models.user import User
+from app.schemas.user import UserRead
+from app.core.cache import principal_cache
 from app.db.repositories.user import UserRepository
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.core.settings import settings
 
 
@@ -46,28 +48,64 @@ def decode_token(token: str) -> dict:
     return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> UserRead:
     """get current user in token.
 
+    The user is cached by token subject, so most requests do not query the
+    database, the cached entry never outlives the token expiration.
+
     Args:
-        db (Session): Database session
+        db (AsyncSession): Database session
         token (str, optional): Token from HTTP request.
         Defaults to Depends(oauth2_scheme).
 
     Raises:
-        HTTPException: If token was invalid and not have sub.
+        HTTPException: If token was invalid, not have a numeric sub or an exp,
+        or the user does not exists.
 
     Returns:
-        User: User instance
+        UserRead: User data
     """
     try:
         payload = decode_token(token)
-        user_email = payload.get("email", None)
-        if user_email is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user_repository = UserRepository(db)
-        return user_repository.get_user_by_email(user_email)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    subject = payload.get("sub", None)
+    expires_at = payload.get("exp", None)
+    if not isinstance(subject, str) or not subject.isdigit() or expires_at is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = principal_cache.get(subject)
+    if user is None:
+        user_repository = UserRepository(db)
+        db_user = await user_repository.get_user_by_id(int(subject))
+        if db_user is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        user = UserRead.model_validate(db_user)
+        principal_cache.set(subject, user, ttl=expires_at - time.time())
+    # Writes of this session pin the user reads to the primary, see get_read_db.
+    db.info["principal_id"] = subject
+    return user
+
+
+async def get_current_admin(
+    current_user: UserRead = Depends(get_current_user),
+) -> UserRead:
+    """get current user in token if it is an admin.
+
+    Admins are the users whose email is in the ADMIN_EMAILS setting.
+
+    Args:
+        current_user (UserRead, optional): User from request in JWT.
+
+    Raises:
+        HTTPException: If the user is not an admin.
+
+    Returns:
+        UserRead: User data
+    """
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
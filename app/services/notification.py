@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.settings import settings
+from app.db.repositories.notification import TASK_ASSIGNMENT, NotificationRepository
+from app.schemas.notification import NotificationMessage
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationSender(Protocol):
+    """Delivers outbox notifications, e.g. by email.
+
+    send must raise to have the notification retried, and should use the
+    dedup_key to make deliveries idempotent, since a notification may be sent
+    again if the dispatcher stops before recording it.
+    """
+
+    async def send(self, message: NotificationMessage) -> None: ...
+
+
+class LoggingSender:
+    """Sender that logs the notifications, used until a mailer is wired."""
+
+    async def send(self, message: NotificationMessage) -> None:
+        """Log a notification.
+
+        Args:
+            message (NotificationMessage): Notification to send.
+        """
+        if message.kind == TASK_ASSIGNMENT:
+            logger.info(
+                "Sending invitation email to user ID %s, task ID %s",
+                message.payload["user_id"],
+                message.payload["task_id"],
+            )
+        else:
+            logger.info("Sending %s notification %s", message.kind, message.payload)
+
+
+class FakeSender:
+    """In memory sender for local runs and tests.
+
+    Attributes:
+        sent (list[NotificationMessage]): Delivered notifications.
+        failures (int): Number of next sends that raise.
+    """
+
+    def __init__(self, failures: int = 0) -> None:
+        """Constructor class method.
+
+        Args:
+            failures (int, optional): Number of next sends that raise.
+            Defaults to 0.
+        """
+        self.sent: list[NotificationMessage] = []
+        self.failures = failures
+
+    async def send(self, message: NotificationMessage) -> None:
+        """Record a notification, or raise while there are failures left.
+
+        Args:
+            message (NotificationMessage): Notification to send.
+
+        Raises:
+            ConnectionError: While there are failures left.
+        """
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("Fake sender failure")
+        self.sent.append(message)
+
+
+SENDERS = {"logging": LoggingSender, "fake": FakeSender}
+
+
+def backoff(attempts: int) -> timedelta:
+    """Get the delay before retrying a notification.
+
+    Args:
+        attempts (int): Attempts made so far.
+
+    Returns:
+        timedelta: NOTIFICATION_BACKOFF_SECONDS doubled on every attempt, capped
+        at NOTIFICATION_MAX_BACKOFF_SECONDS.
+    """
+    seconds = settings.NOTIFICATION_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.NOTIFICATION_MAX_BACKOFF_SECONDS))
+
+
+class NotificationDispatcher:
+    """Drains the notification outbox in batches."""
+
+    def __init__(
+        self, sessions: async_sessionmaker, sender: NotificationSender
+    ) -> None:
+        """Constructor class method.
+
+        Args:
+            sessions (async_sessionmaker): Session factory.
+            sender (NotificationSender): Sender of the notifications.
+        """
+        self.sessions = sessions
+        self.sender = sender
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch of due notifications.
+
+        Failed notifications are retried with exponential backoff until
+        NOTIFICATION_MAX_ATTEMPTS, then marked as failed.
+
+        Returns:
+            int: Number of claimed notifications.
+        """
+        async with self.sessions() as db:
+            repository = NotificationRepository(db)
+            rows = await repository.claim(
+                settings.NOTIFICATION_BATCH_SIZE,
+                timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS),
+            )
+            sent = []
+            for row in rows:
+                message = NotificationMessage.model_validate(row)
+                try:
+                    await self.sender.send(message)
+                except Exception as e:
+                    retry_at = None
+                    if message.attempts < settings.NOTIFICATION_MAX_ATTEMPTS:
+                        retry_at = datetime.now(timezone.utc) + backoff(
+                            message.attempts
+                        )
+                    logger.warning(
+                        "Notification %s attempt %s failed: %r",
+                        message.id,
+                        message.attempts,
+                        e,
+                    )
+                    await repository.mark_failed(message.id, repr(e), retry_at)
+                else:
+                    sent.append(message.id)
+            await repository.mark_sent(sent)
+        return len(rows)
+
+    async def run(self) -> None:
+        """Dispatch batches until cancelled.
+
+        Full batches are followed by the next one right away, otherwise the
+        outbox is polled every NOTIFICATION_POLL_SECONDS.
+        """
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                claimed = 0
+            if claimed < settings.NOTIFICATION_BATCH_SIZE:
+                await asyncio.sleep(settings.NOTIFICATION_POLL_SECONDS)
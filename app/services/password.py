@@ -0,0 +1,213 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from app.core.metrics import REGISTRY, CallbackMetric
+from app.core.settings import settings
+from app.exceptions import PasswordHashingBusy
+
+
+# min and max rounds equal to the work factor make needs_update flag every
+# hash created with another factor, so it is rehashed on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+_executor: ProcessPoolExecutor | None = None
+_stats = {"pending": 0, "completed": 0, "rejected": 0, "failed": 0}
+
+
+def _hash(password: str) -> str:
+    """hash the str password, runs in the worker processes.
+
+    Args:
+        password (str): password to hash.
+
+    Returns:
+        str: password with hash.
+    """
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """verify a password and rehash it if needed, runs in the worker processes.
+
+    Args:
+        plain_password (str): password to validate.
+        hashed_password (str): hashed password to compare with plain password.
+
+    Returns:
+        tuple[bool, str | None]: if the password is valid and the new hash when
+        the stored one uses another work factor.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """get the process pool for password hashing, created on first use.
+
+    Workers are spawned instead of forked, forking a process with running
+    threads (event loop, database drivers) is unsafe.
+
+    Returns:
+        ProcessPoolExecutor: Process pool.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """shutdown the process pool, a new one is created on next use."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(function, *args):
+    """run a hashing function out of the event loop.
+
+    Operations that return count as completed, those that raise (including a
+    broken pool twice) as failed, and those refused because the queue is full
+    as rejected.
+
+    Args:
+        function: Hashing function to run.
+        *args: Function arguments.
+
+    Raises:
+        PasswordHashingBusy: If there are PASSWORD_HASH_MAX_PENDING operations
+        queued or running, or the new pool breaks as well.
+
+    Returns:
+        Any: Function result.
+    """
+    if _stats["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+        _stats["rejected"] += 1
+        raise PasswordHashingBusy()
+
+    _stats["pending"] += 1
+    try:
+        result = await _run_in_pool(function, *args)
+    except BaseException:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _stats["pending"] -= 1
+    _stats["completed"] += 1
+    return result
+
+
+async def _run_in_pool(function, *args):
+    """run a hashing function in the process pool, or a thread without workers.
+
+    A pool broken by a dead worker is replaced and the function retried once.
+
+    Args:
+        function: Hashing function to run.
+        *args: Function arguments.
+
+    Raises:
+        PasswordHashingBusy: If the new pool breaks as well.
+
+    Returns:
+        Any: Function result.
+    """
+    if settings.PASSWORD_HASH_WORKERS == 0:
+        return await run_in_threadpool(function, *args)
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        executor = get_executor()
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            # Other operations may have replaced the broken pool already.
+            if _executor is executor:
+                shutdown_executor()
+    raise PasswordHashingBusy()
+
+
+async def get_password_hash(password: str) -> str:
+    """hash the str password in the process pool.
+
+    Args:
+        password (str): password to hash.
+
+    Returns:
+        str: password with hash.
+    """
+    return await _run(_hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """verify plain password with hashed password in the process pool.
+
+    Args:
+        plain_password (str): password to validate.
+        hashed_password (str): hashed password to compare with plain password.
+
+    Returns:
+        tuple[bool, str | None]: if the passwords validation is correct or not
+        and the new hash when the work factor changed.
+    """
+    return await _run(_verify_and_update, plain_password, hashed_password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """verify plain password with hashed password in the process pool.
+
+    Args:
+        plain_password (str): password to validate.
+        hashed_password (str): hashed password to compare with plain password.
+
+    Returns:
+        bool: if the passwords validation is correct or not.
+    """
+    valid, _ = await verify_and_update_password(plain_password, hashed_password)
+    return valid
+
+
+def password_pool_stats() -> dict:
+    """get password hashing queue metrics.
+
+    Returns:
+        dict: pending (queued or running), completed, rejected (queue full) and
+        failed operations, the max pending operations and the number of workers.
+    """
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        **_stats,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+        "workers": multiprocessing.cpu_count() if workers is None else workers,
+    }
+
+
+for _stat, _type in (
+    ("pending", "gauge"),
+    ("completed", "counter"),
+    ("rejected", "counter"),
+    ("failed", "counter"),
+):
+    REGISTRY.register(
+        CallbackMetric(
+            f"password_hash_{_stat}{'_total' if _type == 'counter' else ''}",
+            f"Password hashing operations {_stat}.",
+            lambda stat=_stat: [({}, _stats[stat])],
+            _type,
+        )
+    )
@@ -1,4 +1,11 @@
-from sqlalchemy.orm import Session
+import csv
+import io
+import json
+import re
+from collections import defaultdict
+from typing import AsyncIterator, Iterable
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.task import (
     TaskCreate,
     TaskListCreate,
@@ -7,26 +14,138 @@ from app.schemas.task import (
     TaskListRead,
     TaskUpdate,
     TaskListFilter,
+    TaskFilter,
+    TaskBulkCreate,
+    TaskBulkSelection,
+    TaskBulkStatusUpdate,
+    TaskBulkInChargeUpdate,
+    TaskBulkResult,
+    TaskBulkDeleteResult,
+    TASK_READ_LIST,
 )
-from app.db.models.task import Task, TaskList
-from app.db.repositories.task import TaskRepository, TaskListRepository
-from app.exceptions import TaskDoesNotExists, TaskListDoesNotExists
-from app.core.enums.general_enums import TaskStatusEnum
+from app.db.repositories.task import (
+    TASK_FIELDS,
+    TaskRepository,
+    TaskListRepository,
+)
+from app.exceptions import TaskDoesNotExists, TaskListDoesNotExists, InvalidCursor
+from app.core.enums.general_enums import ExportFormat, TaskStatusEnum
+from app.core.etag import make_etag
+from app.core.pagination import encode_cursor, decode_cursor
+
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ("id", "user_id", "task_list_id", "description", "status", "priority")
+
+
+def export_values(row) -> tuple:
+    """Get the exported values of a task row, enums as their values.
+
+    Args:
+        row (Row): Task row.
+
+    Returns:
+        tuple: Values in EXPORT_COLUMNS order.
+    """
+    return (
+        row.id,
+        row.user_id,
+        row.task_list_id,
+        row.description,
+        row.status.value,
+        row.priority.value,
+    )
+
+
+def task_reads(rows: Iterable[Row]) -> list[TaskRead]:
+    """Build TaskRead models from task rows in one validation pass.
+
+    Rows start with the TASK_COLUMNS, extra columns like the search rank are
+    ignored. Zipping the values with the field names is cheaper than reading
+    the Row attributes one by one.
+
+    Args:
+        rows (Iterable[Row]): Task rows.
+
+    Returns:
+        list[TaskRead]: Tasks in the order of the rows.
+    """
+    return TASK_READ_LIST.validate_python([dict(zip(TASK_FIELDS, row)) for row in rows])
+
+
+def encode_ndjson(values: Iterable[tuple]) -> bytes:
+    """Encode exported values as newline delimited JSON.
+
+    Args:
+        values (Iterable[tuple]): Values of the rows in EXPORT_COLUMNS order.
+
+    Returns:
+        bytes: One JSON object per row, each ended by a new line.
+    """
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in values
+    ).encode()
+
+
+def encode_csv(values: Iterable[tuple]) -> bytes:
+    """Encode exported values as CSV lines.
+
+    Args:
+        values (Iterable[tuple]): Values of the rows.
+
+    Returns:
+        bytes: One CSV line per row.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(values)
+    return buffer.getvalue().encode()
+
+
+def prefix_tsquery(text: str) -> str | None:
+    """Build a to_tsquery query matching every word of a text as a prefix.
+
+    Only word characters are kept, so user input can not break the tsquery
+    syntax.
+
+    Args:
+        text (str): Search text, e.g. "fix log".
+
+    Returns:
+        str | None: Query like "fix:* & log:*", None if there are no words.
+    """
+    words = re.findall(r"\w+", text)
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+def missing_ids(requested_ids: list[int] | None, found_ids: list[int]) -> list[int]:
+    """Get the requested ids that were not found.
+
+    Args:
+        requested_ids (list[int] | None): Requested ids, None when the tasks
+        were selected by filters.
+        found_ids (list[int]): Ids found in database.
+
+    Returns:
+        list[int]: Sorted ids not found.
+    """
+    if requested_ids is None:
+        return []
+    return sorted(set(requested_ids) - set(found_ids))
 
 
 class TaskService:
     """Task service class."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """Contructor of class
 
         Args:
-            db (Session): Database Session.
+            db (AsyncSession): Database Session.
         """
         self.db = db
         self.task_repository = TaskRepository(db)
 
-    def create_task(self, data: TaskCreate) -> TaskRead:
+    async def create_task(self, data: TaskCreate) -> TaskRead:
         """Service to reate task.
 
         Args:
@@ -36,80 +155,255 @@ class TaskService:
         Returns:
             Task: Task instance
         """
-        task = self.task_repository.create(data)
+        task = await self.task_repository.create(data)
         return TaskRead.model_validate(task, from_attributes=True)
 
-    def get_task(self, task_id: int) -> TaskRead:
+    async def get_task_etag(self, task_id: int) -> str:
+        """Service to get the ETag of a task from its row version.
+
+        Args:
+            task_id (int): task id.
+
+        Raises:
+            TaskDoesNotExists: If task id does not exists.
+
+        Returns:
+            str: Strong ETag of the task.
+        """
+        version = await self.task_repository.get_version(task_id)
+        if version is None:
+            raise TaskDoesNotExists(task_id)
+        return make_etag("task", task_id, version)
+
+    async def get_task(self, task_id: int) -> TaskRead:
         """Service to get task.
 
         Args:
             db (Session): Database session.
             task_id (int): task id.
 
+        Raises:
+            TaskDoesNotExists: If task id does not exists.
+
         Returns:
             TaskRead: _description_
         """
-        task = self.task_repository.get_by_id(task_id)
+        task = await self.task_repository.get_by_id(task_id)
+        if not task:
+            raise TaskDoesNotExists(task_id)
         return TaskRead.model_validate(task)
 
-    def update_task(self, task_id: int, data: TaskUpdate) -> TaskRead:
+    async def update_task(self, task_id: int, data: TaskUpdate) -> TaskRead:
         """Service to update task
 
+        When the user in charge changes, the invitation is queued in the
+        notification outbox with the update.
+
         Args:
             db (Session): Database session.
             task_id (int): task id.
             data (TaskUpdate): Data from task to update.
 
+        Raises:
+            TaskDoesNotExists: If task id does not exists.
+
         Returns:
             TaskRead: Data from task.
         """
-        existing_task = self.task_repository.get_by_id(task_id)
-        if not existing_task:
+        row = await self.task_repository.update(task_id, data)
+        if row is None:
             raise TaskDoesNotExists(task_id)
+        return task_reads([row])[0]
 
-        previous_assignee = existing_task.user_id
-        new_assignee = data.user_id if hasattr(data, "user_id") else None
+    async def delete_task(self, task_id: int) -> bool:
 
-        updated_task = self.task_repository.update(task_id, data)
-        if not updated_task:
+        if not await self.task_repository.delete(task_id):
             raise TaskDoesNotExists(task_id)
+        return True
 
-        if new_assignee and new_assignee != previous_assignee:
-            print(
-                f"Sending invitation email to user ID {new_assignee}, task ID {task_id}"
-            )
+    async def create_tasks(self, data: TaskBulkCreate) -> TaskBulkResult:
+        """Service to create many tasks in one transaction.
 
-        return TaskRead.model_validate(updated_task)
+        Args:
+            data (TaskBulkCreate): Tasks data to create.
 
-    def delete_task(self, task_id: int) -> bool:
+        Returns:
+            TaskBulkResult: Created tasks.
+        """
+        rows = await self.task_repository.create_many(data.tasks)
+        return TaskBulkResult(tasks=task_reads(rows))
 
-        if not self.task_repository.delete(task_id):
-            raise TaskDoesNotExists(task_id)
-        return True
+    async def bulk_update_status(self, data: TaskBulkStatusUpdate) -> TaskBulkResult:
+        """Service to update the status of many tasks in one statement.
 
-    def list_all_tasks(self) -> list[TaskRead]:
-        """List all tasks.
+        Args:
+            data (TaskBulkStatusUpdate): Selected tasks and new status.
 
         Returns:
-            list[TaskRead]: List all of tasks.
+            TaskBulkResult: Updated tasks and the requested ids that do not exist.
         """
-        tasks = self.task_repository.list_all()
-        return [TaskRead.model_validate(task) for task in tasks]
+        rows = await self.task_repository.bulk_update(
+            {"status": data.status}, data.ids, data.filters
+        )
+        return TaskBulkResult(
+            tasks=task_reads(rows),
+            missing_ids=missing_ids(data.ids, [row.id for row in rows]),
+        )
+
+    async def bulk_update_in_charge(
+        self, data: TaskBulkInChargeUpdate
+    ) -> TaskBulkResult:
+        """Service to update the user in charge of many tasks in one statement.
+
+        The invitation of the new user is queued in the notification outbox
+        for every task that was not already in their charge.
+
+        Args:
+            data (TaskBulkInChargeUpdate): Selected tasks and new user in charge.
+
+        Returns:
+            TaskBulkResult: Updated tasks and the requested ids that do not exist.
+        """
+        rows = await self.task_repository.bulk_update(
+            {"user_id": data.user_id}, data.ids, data.filters
+        )
+        return TaskBulkResult(
+            tasks=task_reads(rows),
+            missing_ids=missing_ids(data.ids, [row.id for row in rows]),
+        )
+
+    async def bulk_delete(self, data: TaskBulkSelection) -> TaskBulkDeleteResult:
+        """Service to delete many tasks in one statement.
+
+        Args:
+            data (TaskBulkSelection): Selected tasks.
+
+        Returns:
+            TaskBulkDeleteResult: Deleted ids and the requested ids that do not
+            exist.
+        """
+        deleted_ids = await self.task_repository.bulk_delete(data.ids, data.filters)
+        return TaskBulkDeleteResult(
+            deleted_ids=deleted_ids, missing_ids=missing_ids(data.ids, deleted_ids)
+        )
+
+    async def export_tasks(
+        self, filters: TaskFilter, export_format: ExportFormat
+    ) -> AsyncIterator[bytes]:
+        """Service to export the filtered tasks in chunks.
+
+        Tasks are read with a server side cursor and encoded one batch at a
+        time, so memory does not grow with the number of tasks.
+
+        Args:
+            filters (TaskFilter): Filters to apply to tasks.
+            export_format (ExportFormat): NDJSON or CSV.
+
+        Yields:
+            AsyncIterator[bytes]: Encoded chunks of EXPORT_BATCH_SIZE tasks,
+            preceded by the header line for CSV.
+        """
+        if export_format == ExportFormat.CSV:
+            encode = encode_csv
+            yield encode_csv([EXPORT_COLUMNS])
+        else:
+            encode = encode_ndjson
+        async for rows in self.task_repository.stream(filters, EXPORT_BATCH_SIZE):
+            yield encode(export_values(row) for row in rows)
+
+    async def search_tasks(
+        self, text: str, filters: TaskFilter, limit: int, cursor: str | None = None
+    ) -> tuple[list[TaskRead], str | None]:
+        """Search a page of tasks whose description has every word of text.
+
+        Words match as prefixes, the most relevant tasks come first.
+
+        Args:
+            text (str): Search text.
+            filters (TaskFilter): Filters to apply to tasks.
+            limit (int): Max number of tasks in the page.
+            cursor (str | None, optional): Cursor returned by the previous page.
+            Defaults to None.
+
+        Raises:
+            InvalidCursor: If the cursor can not be decoded.
+
+        Returns:
+            tuple[list[TaskRead], str | None]: Page of tasks and the cursor to
+            the next page, None if this is the last one.
+        """
+        after = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+                after = (float(position["rank"]), int(position["id"]))
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursor(cursor)
+
+        tsquery = prefix_tsquery(text)
+        if tsquery is None:
+            return [], None
+        rows = await self.task_repository.search_page(
+            tsquery, filters, limit + 1, after
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({"rank": rows[-1].rank, "id": rows[-1].id})
+        return task_reads(rows), next_cursor
+
+    async def list_tasks(
+        self, filters: TaskFilter, limit: int | None, cursor: str | None = None
+    ) -> tuple[list[TaskRead], str | None]:
+        """List a page of tasks.
+
+        Args:
+            filters (TaskFilter): Filters to apply to tasks.
+            limit (int | None): Max number of tasks in the page, None to list
+            all the tasks after the cursor.
+            cursor (str | None, optional): Cursor returned by the previous page.
+            Defaults to None.
+
+        Raises:
+            InvalidCursor: If the cursor can not be decoded.
+
+        Returns:
+            tuple[list[TaskRead], str | None]: Page of tasks and the cursor to
+            the next page, None if this is the last one.
+        """
+        after_id = None
+        if cursor:
+            try:
+                after_id = int(decode_cursor(cursor)["id"])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursor(cursor)
+
+        if limit is None:
+            rows = await self.task_repository.list_page(filters, None, after_id)
+            return task_reads(rows), None
+
+        rows = await self.task_repository.list_page(filters, limit + 1, after_id)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({"id": rows[-1].id})
+        return task_reads(rows), next_cursor
 
 
 class TaskListService:
     """Task list service class."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         """Contructor of class
 
         Args:
-            db (Session): Database Session.
+            db (AsyncSession): Database Session.
         """
         self.db = db
         self.task_list_repository = TaskListRepository(db)
+        self.task_repository = TaskRepository(db)
 
-    def create_task_list(self, data: TaskListCreate) -> TaskList:
+    async def create_task_list(self, data: TaskListCreate) -> TaskListRead:
         """create task service.
 
         Args:
@@ -117,51 +411,85 @@ class TaskListService:
             data (TaskCreate): Task data to create
 
         Returns:
-            TaskList: TaskList instance
+            TaskListRead: Task list data, a new list has no tasks.
         """
-        task_list = self.task_list_repository.create(data)
-        return task_list
+        task_list = await self.task_list_repository.create(data)
+        return TaskListRead(id=task_list.id, name=task_list.name, tasks=[])
 
-    def get_task_list(self, task_list_id: int, filters: TaskListFilter) -> TaskListRead:
-        """Get tasks list service.
+    async def get_task_list_etag(
+        self, task_list_id: int, filters: TaskListFilter
+    ) -> str:
+        """Service to get the ETag of a task list from its row version.
+
+        The list version changes with the list and any of its tasks, the
+        filters and cursor are part of the ETag since they change the payload.
 
         Args:
             task_list_id (int): Task list id.
-            filters (TaskListFilter): Filters to tasks in list of tasks.
+            filters (TaskListFilter): Filters and pagination to tasks in list of
+            tasks.
 
         Raises:
             TaskListDoesNotExists: If task list id does not exists.
 
         Returns:
-            TaskListRead: Task list data.
+            str: Strong ETag of the task list.
         """
-
-        task_list = self.task_list_repository.get_by_id(task_list_id)
-        if not task_list_id:
+        version = await self.task_list_repository.get_version(task_list_id)
+        if version is None:
             raise TaskListDoesNotExists(task_list_id)
+        return make_etag(
+            "task-list", task_list_id, version, filters.model_dump(mode="json")
+        )
 
-        task_query = self.db.query(Task).filter(Task.task_list_id == task_list_id)
-        filtered_tasks = task_query.all()
-        total = len(filtered_tasks)
-        completed_tasks = [
-            task for task in filtered_tasks if task.status == TaskStatusEnum.COMPLETED
-        ]
-        percentage = (len(completed_tasks) / total * 100) if total > 0 else 0
+    async def get_task_list(
+        self, task_list_id: int, filters: TaskListFilter
+    ) -> tuple[TaskListRead, str | None]:
+        """Get tasks list service.
 
-        if filters.priority is not None:
-            task_query = task_query.filter(Task.priority == filters.priority)
-        if filters.status is not None:
-            task_query = task_query.filter(Task.status == filters.status)
+        Filters, pagination and the percentage of completeness are resolved
+        by the database, the percentage counts every task of the list.
 
-        task_list_data = TaskListRead.model_validate(task_list)
-        task_list_data.tasks = [TaskRead.model_validate(t) for t in filtered_tasks]
-        task_list_data.percentage_of_completeness = percentage
+        Args:
+            task_list_id (int): Task list id.
+            filters (TaskListFilter): Filters and pagination to tasks in list of
+            tasks.
+
+        Raises:
+            TaskListDoesNotExists: If task list id does not exists.
+            InvalidCursor: If the tasks cursor can not be decoded.
 
-        return task_list_data
+        Returns:
+            tuple[TaskListRead, str | None]: Task list data and the cursor to the
+            next page of tasks, None if this is the last one.
+        """
+        task_list = await self.task_list_repository.get_with_completeness(task_list_id)
+        if not task_list:
+            raise TaskListDoesNotExists(task_list_id)
 
-    def create_task_list_with_tasks(self, data: TaskListWithTasks) -> TaskListRead:
+        task_filter = TaskFilter(
+            task_list_id=task_list_id, status=filters.status, priority=filters.priority
+        )
+        tasks, next_cursor = await TaskService(self.db).list_tasks(
+            task_filter, filters.limit, filters.after
+        )
+
+        task_list_data = TaskListRead(
+            id=task_list.id,
+            name=task_list.name,
+            percentage_of_completeness=task_list.percentage_of_completeness,
+            tasks=tasks,
+        )
+        return task_list_data, next_cursor
+
+    async def create_task_list_with_tasks(
+        self, data: TaskListWithTasks
+    ) -> TaskListRead:
         """Service to create task list with data.
 
+        The list and its tasks are created in one transaction and the response
+        is built from the inserted rows, without querying them again.
+
         Args:
             db (Session): Database session
             data (TaskListWithTasks): Task list with tasks data.
@@ -169,25 +497,63 @@ class TaskListService:
         Returns:
             TaskListRead: Task list data.
         """
-        task_service = TaskService(self.db)
-        task_list = self.create_task_list(data.task_list)
-        for task in data.tasks:
-            task.task_list_id = task_list.id
-            task = task_service.create_task(task)
+        task_list, rows = await self.task_list_repository.create_with_tasks(
+            data.task_list, data.tasks
+        )
+        tasks = task_reads(rows)
+        completed = sum(task.status == TaskStatusEnum.COMPLETED for task in tasks)
+        return TaskListRead(
+            id=task_list.id,
+            name=task_list.name,
+            percentage_of_completeness=completed / len(tasks) * 100 if tasks else 0,
+            tasks=tasks,
+        )
+
+    async def reconcile_counters(self, batch_size: int = 1000) -> list[int]:
+        """Service to repair drifted task counters of all the task lists.
+
+        Args:
+            batch_size (int, optional): Number of lists locked and recounted per
+            transaction. Defaults to 1000.
 
-        self.db.commit()
-        self.db.refresh(task_list)
-        return TaskListRead.model_validate(task_list)
+        Returns:
+            list[int]: Ids of the repaired lists.
+        """
+        repaired = []
+        after_id = 0
+        while after_id is not None:
+            after_id, batch = await self.task_list_repository.reconcile_counters(
+                after_id, batch_size
+            )
+            repaired.extend(batch)
+        return repaired
 
-    def list_all_task_lists(self) -> list[TaskListRead]:
+    async def list_all_task_lists(self) -> list[TaskListRead]:
         """List all task lists including their tasks.
 
+        Uses one aggregated query for the lists and their completeness and one
+        batched query for the tasks of all lists.
+
         Returns:
             list[TaskListRead]: List all task lists including their tasks.
         """
-        print("entro")
-        task_lists = self.task_list_repository.list_all()
+        task_lists = await self.task_list_repository.list_with_completeness()
+        if not task_lists:
+            return []
+
+        tasks_by_list = defaultdict(list)
+        rows = await self.task_repository.list_by_task_lists(
+            [task_list.id for task_list in task_lists]
+        )
+        for task in task_reads(rows):
+            tasks_by_list[task.task_list_id].append(task)
+
         return [
-            self.get_task_list(tl.id, TaskListFilter(status=None, priority=None))
-            for tl in task_lists
+            TaskListRead(
+                id=task_list.id,
+                name=task_list.name,
+                percentage_of_completeness=task_list.percentage_of_completeness,
+                tasks=tasks_by_list[task_list.id],
+            )
+            for task_list in task_lists
         ]
@@ -0,0 +1,208 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+import asyncpg
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.enums.general_enums import ExportFormat
+from app.db.repositories.task import TaskRepository
+from app.schemas.task import TaskImportError, TaskImportResult, TaskImportRow
+
+
+IMPORT_BATCH_SIZE = 5000
+MAX_IMPORT_ERRORS = 1000
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of utf-8 bytes chunks in lines.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Body of the file.
+
+    Yields:
+        AsyncIterator[str]: Lines without their line break.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, object]]:
+    """Parse NDJSON lines, blank lines are skipped.
+
+    Args:
+        lines (AsyncIterator[str]): Lines of the file.
+
+    Yields:
+        AsyncIterator[tuple[int, object]]: Line number and the parsed object,
+        or the ValueError when the line is not valid JSON.
+    """
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, object]]:
+    """Parse CSV lines with a header row, blank lines are skipped.
+
+    Quoted values may span several lines, lines are joined until their quotes
+    are balanced. Empty values are read as missing.
+
+    Args:
+        lines (AsyncIterator[str]): Lines of the file.
+
+    Yields:
+        AsyncIterator[tuple[int, object]]: Line number where the row starts and
+        the row as a dict by header.
+    """
+    header = None
+    record, start, number = "", 0, 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+            if not line.strip():
+                continue
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield start, {name: value for name, value in zip(header, values) if value != ""}
+
+
+def validation_message(error: ValidationError) -> str:
+    """Summarize a validation error in one line.
+
+    Args:
+        error (ValidationError): Validation error of a row.
+
+    Returns:
+        str: field: message pairs separated by semicolons.
+    """
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class TaskImportService:
+    """Tasks import service class."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        """Constructor class method.
+
+        Args:
+            db (AsyncSession): Session from database.
+        """
+        self.db = db
+        self.task_repository = TaskRepository(db)
+
+    async def import_tasks(
+        self,
+        chunks: AsyncIterator[bytes],
+        import_format: ExportFormat,
+        default_user_id: int | None = None,
+    ) -> TaskImportResult:
+        """Service to import tasks from a CSV or NDJSON stream.
+
+        Rows are validated against TaskImportRow while the file is read and
+        loaded in batches of IMPORT_BATCH_SIZE with COPY, each batch in its own
+        transaction. Invalid rows and rows of missing users or task lists are
+        reported and skipped, the rest of their batch is imported.
+
+        Args:
+            chunks (AsyncIterator[bytes]): Body of the file.
+            import_format (ExportFormat): NDJSON or CSV, the formats of exports.
+            default_user_id (int | None, optional): User in charge of the rows
+            without user_id. Defaults to None.
+
+        Returns:
+            TaskImportResult: Imported tasks and rejected rows.
+        """
+        parse = iter_csv if import_format == ExportFormat.CSV else iter_ndjson
+        result = TaskImportResult(imported=0, failed=0)
+        batch = []
+        async for line, data in parse(iter_lines(chunks)):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError(f"Expected an object, got {data!r}")
+                row = TaskImportRow.model_validate(data)
+            except ValidationError as e:
+                self.reject(result, line, validation_message(e))
+                continue
+            except ValueError as e:
+                self.reject(result, line, str(e))
+                continue
+            batch.append(
+                (
+                    line,
+                    row.user_id or default_user_id,
+                    row.task_list_id,
+                    row.description,
+                    row.status.name,
+                    row.priority.name,
+                )
+            )
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await self.load(batch, result)
+                batch = []
+        if batch:
+            await self.load(batch, result)
+        return result
+
+    async def load(self, batch: list[tuple], result: TaskImportResult) -> None:
+        """Load a batch of validated rows and add its outcome to the result.
+
+        Args:
+            batch (list[tuple]): Records of TaskRepository.copy_import.
+            result (TaskImportResult): Import result to update.
+        """
+        try:
+            imported, rejected = await self.task_repository.copy_import(batch)
+        except (DBAPIError, asyncpg.PostgresError) as e:
+            # e.g. a user or list deleted while the batch was loaded. The COPY
+            # runs on the raw asyncpg connection, its errors are not wrapped.
+            await self.db.rollback()
+            error = e.orig if isinstance(e, DBAPIError) else e
+            for record in batch:
+                self.reject(result, record[0], f"Batch rejected: {error}")
+            return
+        result.imported += imported
+        for row in rejected:
+            if row.missing_user:
+                self.reject(result, row.line, f"User {row.user_id} does not exist")
+            else:
+                self.reject(
+                    result, row.line, f"Task list {row.task_list_id} does not exist"
+                )
+
+    def reject(self, result: TaskImportResult, line: int, error: str) -> None:
+        """Add a rejected row to the result, keeping MAX_IMPORT_ERRORS of them.
+
+        Args:
+            result (TaskImportResult): Import result to update.
+            line (int): Line of the row.
+            error (str): Why the row was rejected.
+        """
+        result.failed += 1
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(TaskImportError(line=line, error=error))
@@ -0,0 +1,152 @@
+"""Measure the throughput and memory of the streaming tasks export.
+
+Exports every task through TaskService.export_tasks (server side cursor,
+encoded batch by batch) and compares it with loading the full list of tasks
+in memory as GET /tasks/ does without a limit. Every export runs twice: once
+timed and once with tracemalloc tracing its python memory peak, which shows
+how memory grows with the exported rows (tracing slows the run down).
+
+Usage:
+    python -m benchmarks.export_throughput --tasks 1000000 --format ndjson
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.enums.general_enums import ExportFormat
+from app.db.base import Base
+from app.db.session import get_async_url
+from app.schemas.task import TaskFilter
+from app.services.task import TaskService
+from app.core.settings import settings
+from benchmarks.index_plans import seed
+
+
+async def export_streaming(sessions, export_format: ExportFormat) -> dict:
+    """Export all the tasks with the streaming export.
+
+    Args:
+        sessions (async_sessionmaker): Session factory.
+        export_format (ExportFormat): NDJSON or CSV.
+
+    Returns:
+        dict: Exported bytes.
+    """
+    size = 0
+    async with sessions() as db:
+        async for chunk in TaskService(db).export_tasks(TaskFilter(), export_format):
+            size += len(chunk)
+    return {"bytes": size}
+
+
+async def export_in_memory(sessions, export_format: ExportFormat) -> dict:
+    """Export all the tasks loading them in memory first.
+
+    Args:
+        sessions (async_sessionmaker): Session factory.
+        export_format (ExportFormat): Ignored, the tasks are encoded as JSON.
+
+    Returns:
+        dict: Exported bytes.
+    """
+    async with sessions() as db:
+        tasks, _ = await TaskService(db).list_tasks(TaskFilter(), None)
+        body = json.dumps([task.model_dump(mode="json") for task in tasks])
+    return {"bytes": len(body)}
+
+
+async def measure(name: str, export, sessions, export_format, rows: int) -> dict:
+    """Run an export twice, to measure its time and its python memory peak.
+
+    Args:
+        name (str): Export name.
+        export: Export coroutine function.
+        sessions (async_sessionmaker): Session factory.
+        export_format (ExportFormat): NDJSON or CSV.
+        rows (int): Number of exported tasks.
+
+    Returns:
+        dict: Seconds, rows per second, MB per second and memory peak in MB.
+    """
+    start = time.perf_counter()
+    result = await export(sessions, export_format)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    await export(sessions, export_format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = {
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds),
+        "mb_per_second": round(result["bytes"] / seconds / 2**20, 2),
+        "peak_memory_mb": round(peak / 2**20, 2),
+    }
+    print(
+        f"  {name:<10} {stats['seconds']:>8.3f} s  "
+        f"{stats['rows_per_second']:>9} rows/s  {stats['mb_per_second']:>7} MB/s  "
+        f"peak {stats['peak_memory_mb']:>8} MB"
+    )
+    return stats
+
+
+async def run(database_url: str, export_format: ExportFormat, rows: int) -> dict:
+    """Measure both exports.
+
+    Args:
+        database_url (str): Database url.
+        export_format (ExportFormat): NDJSON or CSV.
+        rows (int): Number of exported tasks.
+
+    Returns:
+        dict: Stats by export name.
+    """
+    engine = create_async_engine(get_async_url(database_url))
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    results = {
+        "streaming": await measure(
+            "streaming", export_streaming, sessions, export_format, rows
+        ),
+        "in_memory": await measure(
+            "in memory", export_in_memory, sessions, export_format, rows
+        ),
+    }
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    """Seed the dataset and print the export throughput and memory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=2_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument(
+        "--format", type=ExportFormat, choices=list(ExportFormat), default="ndjson"
+    )
+    parser.add_argument("--output", help="Write the results to this json file")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM tasks)")).scalar():
+            print(f"Seeding {args.tasks} tasks in {args.lists} lists...")
+            seed(conn, args.users, args.lists, args.tasks)
+        rows = conn.execute(text("SELECT count(*) FROM tasks")).scalar()
+
+    print(f"Exporting {rows} tasks as {args.format.value}:")
+    results = asyncio.run(run(args.database_url, args.format, rows))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"rows": rows, "format": args.format.value, **results}, file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Compare query plans of the task access patterns with and without indexes.
+
+Seeds a skewed dataset (when the tables are empty) and runs
+EXPLAIN (ANALYZE, BUFFERS) for the queries issued by the repositories, first
+with the access pattern indexes dropped inside a rolled back transaction and
+then with the indexes in place.
+
+Usage:
+    python -m benchmarks.index_plans --tasks 1000000 --lists 2000 --users 500
+
+Run it against a scratch database only: dropping the indexes takes an
+ACCESS EXCLUSIVE lock on the tables until the transaction is rolled back.
+"""
+
+import argparse
+import json
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.models import task, user  # noqa: F401
+
+
+ACCESS_PATTERN_INDEXES = [
+    "ix_tasks_task_list_id_status",
+    "ix_tasks_task_list_id_id",
+    "ix_tasks_user_id_id",
+    "ix_tasks_status_id",
+    "ix_task_lists_user_id",
+]
+
+QUERIES = {
+    "task list page filtered by status": (
+        "SELECT * FROM tasks WHERE task_list_id = :task_list_id "
+        "AND status = 'PENDING' ORDER BY id LIMIT 100"
+    ),
+    "task list completeness": (
+        "SELECT count(*), count(*) FILTER (WHERE status = 'COMPLETED') "
+        "FROM tasks WHERE task_list_id = :task_list_id"
+    ),
+    "tasks in charge of user page": (
+        "SELECT * FROM tasks WHERE user_id = :user_id ORDER BY id LIMIT 100"
+    ),
+    "tasks page filtered by status": (
+        "SELECT * FROM tasks WHERE status = 'CANCELLED' AND id > :after_id "
+        "ORDER BY id LIMIT 100"
+    ),
+    "task lists of user": "SELECT * FROM task_lists WHERE user_id = :user_id",
+}
+
+# Lists and users of median size are the typical lookup, the biggest ones
+# hold a large share of the table and are read sequentially either way.
+MEDIAN_GROUP = (
+    "SELECT {0} FROM tasks GROUP BY {0} ORDER BY count(*) "
+    "OFFSET (SELECT count(DISTINCT {0}) / 2 FROM tasks) LIMIT 1"
+)
+
+
+def seed(conn: Connection, users: int, lists: int, tasks: int) -> None:
+    """Seed users, task lists and tasks with generate_series.
+
+    List sizes and assignees are skewed towards the lowest ids, so a few
+    lists and users concentrate most of the tasks. The task counters of the
+    lists are filled once the tasks are inserted.
+
+    Args:
+        conn (Connection): Database connection.
+        users (int): Number of users.
+        lists (int): Number of task lists.
+        tasks (int): Number of tasks.
+    """
+    conn.execute(
+        text(
+            "INSERT INTO users (full_name, email, password) "
+            "SELECT 'user ' || i, 'user' || i || '@example.com', 'not-a-hash' "
+            "FROM generate_series(1, :users) AS i"
+        ),
+        {"users": users},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO task_lists (name, user_id) "
+            "SELECT 'list ' || i, 1 + floor(power(random(), 2) * :users)::int "
+            "FROM generate_series(1, :lists) AS i"
+        ),
+        {"users": users, "lists": lists},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO tasks (user_id, task_list_id, description, status, priority) "
+            "SELECT 1 + floor(power(random(), 3) * :users)::int, "
+            "1 + floor(power(random(), 3) * :lists)::int, 'task ' || i, "
+            "(ARRAY['PENDING', 'PENDING', 'IN_PROGRESS', 'COMPLETED', 'COMPLETED', "
+            "'COMPLETED', 'CANCELLED'])[1 + floor(random() * 7)::int]"
+            "::task_status_enum, "
+            "(ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + floor(random() * 3)::int]"
+            "::priority_enum "
+            "FROM generate_series(1, :tasks) AS i"
+        ),
+        {"users": users, "lists": lists, "tasks": tasks},
+    )
+    conn.execute(
+        text(
+            "UPDATE task_lists SET total_tasks = counts.total, "
+            "completed_tasks = counts.completed "
+            "FROM (SELECT task_list_id, count(*) AS total, "
+            "count(*) FILTER (WHERE status = 'COMPLETED') AS completed "
+            "FROM tasks GROUP BY task_list_id) AS counts "
+            "WHERE task_lists.id = counts.task_list_id"
+        )
+    )
+
+
+def explain(conn: Connection, params: dict) -> dict:
+    """Run EXPLAIN (ANALYZE, BUFFERS) for every access pattern query.
+
+    Args:
+        conn (Connection): Database connection.
+        params (dict): Query parameters.
+
+    Returns:
+        dict: Plan and execution time by query name.
+    """
+    plans = {}
+    for name, query in QUERIES.items():
+        result = conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"), params
+        ).scalar()
+        plan = result[0] if isinstance(result, list) else json.loads(result)[0]
+        plans[name] = plan
+    return plans
+
+
+def print_plan(name: str, plan: dict) -> None:
+    """Print the summary line of a plan.
+
+    Args:
+        name (str): Query name.
+        plan (dict): Plan from EXPLAIN (FORMAT JSON).
+    """
+    root = plan["Plan"]
+    buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+    print(
+        f"  {name:<36} {plan['Execution Time']:>10.3f} ms  "
+        f"{buffers:>8} buffers  {root['Node Type']}"
+    )
+
+
+def main() -> None:
+    """Seed the dataset and print the plans before and after the indexes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=2_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--output", help="Write the full plans to this json file")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM tasks)")).scalar():
+            print(f"Seeding {args.tasks} tasks in {args.lists} lists...")
+            seed(conn, args.users, args.lists, args.tasks)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users, task_lists, tasks"))
+
+    with engine.connect() as conn:
+        params = {
+            "task_list_id": conn.execute(
+                text(MEDIAN_GROUP.format("task_list_id"))
+            ).scalar(),
+            "user_id": conn.execute(text(MEDIAN_GROUP.format("user_id"))).scalar(),
+            "after_id": conn.execute(text("SELECT max(id) / 2 FROM tasks")).scalar(),
+        }
+        conn.rollback()
+
+        for index in ACCESS_PATTERN_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        before = explain(conn, params)
+        conn.rollback()
+
+        after = explain(conn, params)
+        conn.rollback()
+
+    print(f"Parameters: {params}")
+    print("Without access pattern indexes:")
+    for name, plan in before.items():
+        print_plan(name, plan)
+    print("With access pattern indexes:")
+    for name, plan in after.items():
+        print_plan(name, plan)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"params": params, "before": before, "after": after}, file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""Measure the latency and throughput of the API under a mixed workload.
+
+Seeds a skewed dataset (when the tables are empty), gives the seeded users a
+known password and drives the API with concurrent clients, each logged in as
+its own user, over a weighted mix of logins, task reads and updates and task
+list reads. Requests go to the app in process through ASGI (with its real
+engines, so DATABASE_URL must point to the seeded database) or to a running
+server, e.g. the web service of docker-compose.yml, with --base-url.
+
+Latency percentiles and requests per second are reported per route template
+and saved as JSON with the commit, so runs can be compared with --compare.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 20 --duration 30
+    python -m benchmarks.load_test --base-url http://localhost:8000 \\
+        --compare benchmarks/results/load_test-<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+import httpx
+from sqlalchemy import create_engine, text
+from app.core.settings import settings
+from app.db.base import Base
+from app.services.password import pwd_context
+from benchmarks.index_plans import seed
+
+
+PASSWORD = "load-test-password"
+STATUSES = ("pending", "in_progress", "completed", "cancelled")
+SEARCH_WORDS = ("task 42", "task 123", "task 7777", "task 31415")
+OPERATIONS = (
+    "login",
+    "list_tasks",
+    "get_task",
+    "update_task",
+    "search_tasks",
+    "get_task_list",
+    "list_task_lists",
+)
+DEFAULT_MIX = (
+    "login=1,list_tasks=6,get_task=6,update_task=3,search_tasks=1,"
+    "get_task_list=4,list_task_lists=0"
+)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def prepare_dataset(database_url: str, users: int, lists: int, tasks: int) -> dict:
+    """Seed the dataset if empty and set the password of the seeded users.
+
+    Args:
+        database_url (str): Database url.
+        users (int): Number of users to seed.
+        lists (int): Number of task lists to seed.
+        tasks (int): Number of tasks to seed.
+
+    Returns:
+        dict: Emails of the users that can log in, max task and list ids and
+        number of tasks.
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM tasks)")).scalar():
+            print(f"Seeding {tasks} tasks in {lists} lists for {users} users...")
+            seed(conn, users, lists, tasks)
+        # One bcrypt hash for all the seeded users, hashing is the slow part.
+        conn.execute(
+            text("UPDATE users SET password = :hash WHERE password = 'not-a-hash'"),
+            {"hash": pwd_context.hash(PASSWORD)},
+        )
+        emails = conn.execute(
+            text("SELECT email FROM users WHERE email LIKE 'user%@example.com'")
+        ).scalars()
+        dataset = {
+            "emails": sorted(emails),
+            "max_task_id": conn.execute(text("SELECT max(id) FROM tasks")).scalar(),
+            "max_list_id": conn.execute(
+                text("SELECT max(id) FROM task_lists")
+            ).scalar(),
+            "tasks": conn.execute(text("SELECT count(*) FROM tasks")).scalar(),
+        }
+    engine.dispose()
+    return dataset
+
+
+def skewed_id(rng: random.Random, max_id: int) -> int:
+    """Pick an id with the skew of the seed, low ids are the busiest."""
+    return 1 + math.floor(rng.random() ** 3 * max_id)
+
+
+def build_request(operation: str, rng: random.Random, dataset: dict) -> tuple:
+    """Build a request of the workload.
+
+    Args:
+        operation (str): Operation name of the mix.
+        rng (random.Random): Random generator of the client.
+        dataset (dict): Dataset ids from prepare_dataset.
+
+    Returns:
+        tuple: Route template, method, path and keyword arguments of httpx.
+    """
+    task_id = rng.randint(1, dataset["max_task_id"])
+    list_id = skewed_id(rng, dataset["max_list_id"])
+    if operation == "list_tasks":
+        params = {"limit": 50}
+        if rng.random() < 0.5:
+            params["task_list_id"] = list_id
+        return "/tasks/", "GET", "/tasks/", {"params": params}
+    if operation == "get_task":
+        return "/tasks/{task_id}", "GET", f"/tasks/{task_id}", {}
+    if operation == "update_task":
+        body = {"status": rng.choice(STATUSES)}
+        return "/tasks/{task_id}", "PUT", f"/tasks/{task_id}", {"json": body}
+    if operation == "search_tasks":
+        params = {"q": rng.choice(SEARCH_WORDS), "limit": 20}
+        return "/tasks/search", "GET", "/tasks/search", {"params": params}
+    if operation == "get_task_list":
+        path = f"/tasks/task-list/{list_id}"
+        return "/tasks/task-list/{task_list_id}", "GET", path, {"params": {"limit": 50}}
+    if operation == "list_task_lists":
+        return "/tasks/task-list", "GET", "/tasks/task-list", {}
+    raise ValueError(f"Unknown operation {operation}")
+
+
+async def login(client: httpx.AsyncClient, email: str, record) -> dict:
+    """Log in and get the authorization headers.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client.
+        email (str): User email.
+        record: Callback that records the latency of the request, or None.
+
+    Returns:
+        dict: Authorization headers.
+    """
+    start = time.perf_counter()
+    response = await client.post(
+        "/auth/login", json={"email": email, "password": PASSWORD}
+    )
+    if record:
+        record("/auth/login", "POST", response.status_code, start)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    email: str,
+    mix: dict[str, int],
+    dataset: dict,
+    seed_value: int,
+    warmup_until: float,
+    stop_at: float,
+    samples: dict,
+) -> None:
+    """Send requests of the mix, one at a time, until stop_at.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client.
+        email (str): User of the client.
+        mix (dict[str, int]): Weight by operation name.
+        dataset (dict): Dataset ids from prepare_dataset.
+        seed_value (int): Seed of the random generator of the client.
+        warmup_until (float): Requests before this time are not recorded.
+        stop_at (float): perf_counter time to stop.
+        samples (dict): Latencies and statuses by (method, route), filled here.
+    """
+    rng = random.Random(seed_value)
+    operations = list(mix)
+    weights = list(mix.values())
+
+    def record(route: str, method: str, status: int, start: float) -> None:
+        end = time.perf_counter()
+        if start < warmup_until:
+            return
+        series = samples.setdefault((method, route), {"latencies": [], "errors": 0})
+        series["latencies"].append(end - start)
+        series["errors"] += status >= 400
+
+    headers = await login(client, email, None)
+    while time.perf_counter() < stop_at:
+        operation = rng.choices(operations, weights)[0]
+        if operation == "login":
+            headers = await login(client, email, record)
+            continue
+        route, method, path, kwargs = build_request(operation, rng, dataset)
+        start = time.perf_counter()
+        response = await client.request(method, path, headers=headers, **kwargs)
+        record(route, method, response.status_code, start)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    index = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[index]
+
+
+def summarize(samples: dict, seconds: float) -> dict:
+    """Compute the latency percentiles and throughput of every route.
+
+    Args:
+        samples (dict): Latencies and errors by (method, route).
+        seconds (float): Measured seconds, without the warmup.
+
+    Returns:
+        dict: Stats by "METHOD route" and for all the requests as "total".
+    """
+
+    def stats(latencies: list[float], errors: int) -> dict:
+        count = len(latencies)
+        latencies = sorted(latencies) or [0.0]
+        return {
+            "requests": count,
+            "errors": errors,
+            "rps": round(count / seconds, 1),
+            "mean_ms": round(sum(latencies) / max(count, 1) * 1000, 2),
+            **{
+                f"p{q}_ms": round(percentile(latencies, q) * 1000, 2)
+                for q in (50, 95, 99)
+            },
+        }
+
+    routes = {
+        f"{method} {route}": stats(series["latencies"], series["errors"])
+        for (method, route), series in sorted(samples.items())
+    }
+    routes["total"] = stats(
+        [value for series in samples.values() for value in series["latencies"]],
+        sum(series["errors"] for series in samples.values()),
+    )
+    return routes
+
+
+async def run(args, dataset: dict, mix: dict[str, int]) -> dict:
+    """Drive the app with the concurrent clients.
+
+    Args:
+        args (argparse.Namespace): Command arguments.
+        dataset (dict): Dataset ids from prepare_dataset.
+        mix (dict[str, int]): Weight by operation name.
+
+    Returns:
+        dict: Stats by route.
+    """
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60)
+        lifespan = None
+    else:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(
+            transport=transport, base_url="http://load-test", timeout=60
+        )
+        lifespan = app.router.lifespan_context(app)
+
+    samples = {}
+    async with client:
+        if lifespan:
+            await lifespan.__aenter__()
+        try:
+            start = time.perf_counter()
+            warmup_until = start + args.warmup
+            stop_at = warmup_until + args.duration
+            emails = dataset["emails"]
+            await asyncio.gather(
+                *(
+                    client_loop(
+                        client,
+                        emails[number % len(emails)],
+                        mix,
+                        dataset,
+                        args.seed + number,
+                        warmup_until,
+                        stop_at,
+                        samples,
+                    )
+                    for number in range(args.concurrency)
+                )
+            )
+            seconds = time.perf_counter() - warmup_until
+        finally:
+            if lifespan:
+                await lifespan.__aexit__(None, None, None)
+    return summarize(samples, seconds)
+
+
+def print_results(routes: dict, previous: dict | None) -> None:
+    """Print the stats table, with the change from a previous run if given."""
+    print(
+        f"{'route':<40} {'reqs':>7} {'err':>5} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for route, stats in routes.items():
+        line = (
+            f"{route:<40} {stats['requests']:>7} {stats['errors']:>5} "
+            f"{stats['rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+            f"{stats['p99_ms']:>8}"
+        )
+        before = (previous or {}).get(route)
+        if before:
+            p95 = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            rps = (stats["rps"] - before["rps"]) / before["rps"] * 100
+            line += f"   p95 {p95:+.1f}%  rps {rps:+.1f}%"
+        print(line)
+
+
+def current_commit() -> str | None:
+    """Get the commit of the working tree, None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse a mix as name=weight pairs separated by commas."""
+    mix = {}
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Invalid mix entry {pair!r}, operations: {', '.join(OPERATIONS)}"
+            )
+        mix[name] = int(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def main() -> None:
+    """Seed the dataset, run the workload and print and save the stats."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--base-url", help="Running server, in process if not set")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=2_000)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results file, by default per commit")
+    parser.add_argument("--compare", help="Results file of a previous run")
+    args = parser.parse_args()
+
+    dataset = prepare_dataset(args.database_url, args.users, args.lists, args.tasks)
+
+    print(
+        f"{args.concurrency} clients for {args.duration} s against "
+        f"{args.base_url or 'the app in process'}, {dataset['tasks']} tasks"
+    )
+    routes = asyncio.run(run(args, dataset, args.mix))
+    previous = None
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)["routes"]
+    print_results(routes, previous)
+
+    commit = current_commit()
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load_test-{commit or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "commit": commit,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "target": args.base_url or "asgi",
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "mix": args.mix,
+                "tasks": dataset["tasks"],
+                "routes": routes,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results saved in {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Micro-benchmarks of the task repositories, services and schemas.
+
+Runs every case against a local Postgres with a fixed dataset (one user and
+task lists of 10, 1k and 100k tasks), reports the median and min time of the
+runs and compares the min times with the stored baselines. A case slower
+than its baseline by more than the threshold is a regression and the
+command exits with status 1.
+
+The database tables are truncated, use a scratch or test database. Baselines
+depend on the machine, save them again with --save-baseline on a new one.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter get_task_list --repeat 10
+    python -m benchmarks.micro --save-baseline
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.enums.general_enums import PriorityEnum, TaskStatusEnum
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.models.task import Task
+from app.db.repositories.task import TASK_COLUMNS, TaskRepository
+from app.db.session import get_async_url
+from app.schemas.task import (
+    TaskBulkStatusUpdate,
+    TaskCreate,
+    TaskFilter,
+    TaskListCreate,
+    TaskListFilter,
+    TaskListWithTasks,
+    TaskRead,
+    TASK_LIST_READ,
+)
+from app.services.task import TaskListService, TaskService, task_reads
+
+
+LIST_SIZES = (10, 1_000, 100_000)
+MIN_SECONDS = 0.5
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+
+
+def prepare_dataset(database_url: str) -> dict:
+    """Truncate the tables and seed one user and a task list of every size.
+
+    Args:
+        database_url (str): Database url.
+
+    Returns:
+        dict: User id and task list id by size.
+    """
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        conn.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE"))
+        user_id = conn.execute(
+            text(
+                "INSERT INTO users (full_name, email, password) "
+                "VALUES ('micro', 'micro@example.com', 'not-a-hash') RETURNING id"
+            )
+        ).scalar()
+        lists = {}
+        for size in LIST_SIZES:
+            lists[size] = conn.execute(
+                text(
+                    "INSERT INTO task_lists (name, user_id) "
+                    "VALUES (:name, :user_id) RETURNING id"
+                ),
+                {"name": f"micro {size}", "user_id": user_id},
+            ).scalar()
+            conn.execute(
+                text(
+                    "INSERT INTO tasks "
+                    "(user_id, task_list_id, description, status, priority) "
+                    "SELECT :user_id, :list_id, 'micro task ' || i, "
+                    "(ARRAY['PENDING', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED'])"
+                    "[1 + i % 4]::task_status_enum, "
+                    "(ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + i % 3]::priority_enum "
+                    "FROM generate_series(1, :size) AS i"
+                ),
+                {"user_id": user_id, "list_id": lists[size], "size": size},
+            )
+        conn.execute(
+            text(
+                "UPDATE task_lists SET total_tasks = counts.total, "
+                "completed_tasks = counts.completed "
+                "FROM (SELECT task_list_id, count(*) AS total, "
+                "count(*) FILTER (WHERE status = 'COMPLETED') AS completed "
+                "FROM tasks GROUP BY task_list_id) AS counts "
+                "WHERE task_lists.id = counts.task_list_id"
+            )
+        )
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text("VACUUM ANALYZE")
+        )
+    engine.dispose()
+    return {"user_id": user_id, "lists": lists}
+
+
+def build_cases(sessions, dataset: dict, rows: list) -> dict:
+    """Build the benchmark cases.
+
+    Args:
+        sessions (async_sessionmaker): Session factory.
+        dataset (dict): Ids from prepare_dataset.
+        rows (list): Task rows of the largest list.
+
+    Returns:
+        dict: Coroutine function of every case by name.
+    """
+    lists = dataset["lists"]
+    largest = lists[LIST_SIZES[-1]]
+    cases = {}
+
+    for size in (1_000, 100_000):
+        sample = rows[:size]
+
+        async def model_validate(sample=sample):
+            [TaskRead.model_validate(row) for row in sample]
+
+        async def one_pass(sample=sample):
+            task_reads(sample)
+
+        cases[f"schemas.task_read_model_validate[{size}]"] = model_validate
+        cases[f"schemas.task_reads[{size}]"] = one_pass
+
+    task_list = TASK_LIST_READ.validate_python(
+        {"id": largest, "name": "micro", "tasks": task_reads(rows[:1_000])}
+    )
+
+    async def dump_task_list():
+        TASK_LIST_READ.dump_json(task_list)
+
+    cases["schemas.task_list_read_dump_json[1000]"] = dump_task_list
+
+    for size in LIST_SIZES:
+
+        async def get_task_list(list_id=lists[size]):
+            async with sessions() as db:
+                await TaskListService(db).get_task_list(list_id, TaskListFilter())
+
+        cases[f"services.get_task_list[{size}]"] = get_task_list
+
+    async def get_task_list_page():
+        async with sessions() as db:
+            await TaskListService(db).get_task_list(
+                largest, TaskListFilter(status=TaskStatusEnum.COMPLETED, limit=50)
+            )
+
+    async def list_tasks_page():
+        async with sessions() as db:
+            await TaskService(db).list_tasks(
+                TaskFilter(task_list_id=largest, priority=PriorityEnum.HIGH), 100
+            )
+
+    async def list_page_rows():
+        async with sessions() as db:
+            await TaskRepository(db).list_page(TaskFilter(task_list_id=largest), 1_000)
+
+    cases["services.get_task_list_page[100000]"] = get_task_list_page
+    cases["services.list_tasks[100]"] = list_tasks_page
+    cases["repositories.list_page[1000]"] = list_page_rows
+
+    for size in (10, 1_000, 10_000):
+        data = TaskListWithTasks(
+            task_list=TaskListCreate(name="micro", user_id=dataset["user_id"]),
+            tasks=[
+                TaskCreate(
+                    user_id=dataset["user_id"],
+                    description=f"micro new task {i}",
+                    priority=PriorityEnum.LOW,
+                )
+                for i in range(size)
+            ],
+        )
+
+        async def create_with_tasks(data=data):
+            async with sessions() as db:
+                await TaskListService(db).create_task_list_with_tasks(data)
+
+        cases[f"services.create_task_list_with_tasks[{size}]"] = create_with_tasks
+
+    ids = [row.id for row in rows[:1_000]]
+    statuses = itertools.cycle([TaskStatusEnum.COMPLETED, TaskStatusEnum.PENDING])
+
+    async def bulk_update_status():
+        async with sessions() as db:
+            await TaskService(db).bulk_update_status(
+                TaskBulkStatusUpdate(ids=ids, status=next(statuses))
+            )
+
+    cases["services.bulk_update_status[1000]"] = bulk_update_status
+    return cases
+
+
+async def measure(case, repeat: int) -> dict:
+    """Run a case once to warm up and then at least repeat times.
+
+    Fast cases run until MIN_SECONDS have passed, so they get more samples.
+    Garbage is collected before every run, so runs do not pay for the
+    garbage of the previous ones.
+
+    Args:
+        case: Coroutine function of the case.
+        repeat (int): Min number of measured runs.
+
+    Returns:
+        dict: Number of runs, median and min milliseconds.
+    """
+    await case()
+    times = []
+    while len(times) < repeat or sum(times) < MIN_SECONDS * 1000:
+        gc.collect()
+        start = time.perf_counter()
+        await case()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": len(times),
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+    }
+
+
+async def run(database_url: str, dataset: dict, name_filter: str, repeat: int):
+    """Measure the cases whose name contains name_filter.
+
+    Args:
+        database_url (str): Database url.
+        dataset (dict): Ids from prepare_dataset.
+        name_filter (str): Substring of the case names to run.
+        repeat (int): Measured runs per case.
+
+    Returns:
+        dict: Stats by case name.
+    """
+    engine = create_async_engine(get_async_url(database_url))
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with sessions() as db:
+        result = await db.execute(
+            select(*TASK_COLUMNS)
+            .where(Task.task_list_id == dataset["lists"][LIST_SIZES[-1]])
+            .order_by(Task.id)
+        )
+        rows = result.all()
+
+    results = {}
+    for name, case in build_cases(sessions, dataset, rows).items():
+        if name_filter in name:
+            results[name] = await measure(case, repeat)
+    await engine.dispose()
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float) -> list[str]:
+    """Print the results next to the baselines.
+
+    The min time of the runs is compared, noise only makes runs slower so it
+    is steadier than the median on a busy machine.
+
+    Args:
+        results (dict): Stats by case name.
+        baselines (dict): Baseline stats by case name.
+        threshold (float): Allowed slowdown, e.g. 0.3 for 30%.
+
+    Returns:
+        list[str]: Names of the regressed cases.
+    """
+    regressions = []
+    print(f"{'case':<50} {'median ms':>11} {'min ms':>10} {'baseline':>10}  change")
+    for name, stats in results.items():
+        baseline = baselines.get(name)
+        line = f"{name:<50} {stats['median_ms']:>11} {stats['min_ms']:>10}"
+        if baseline is None:
+            print(f"{line} {'-':>10}  new")
+            continue
+        change = stats["min_ms"] / baseline["min_ms"] - 1
+        status = ""
+        if change > threshold:
+            regressions.append(name)
+            status = "  REGRESSION"
+        print(f"{line} {baseline['min_ms']:>10}  {change:+.1%}{status}")
+    return regressions
+
+
+def main() -> None:
+    """Run the cases, compare them with the baselines or save new baselines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--filter", default="", help="Run the cases matching it")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the baselines of the measured cases",
+    )
+    args = parser.parse_args()
+
+    dataset = prepare_dataset(args.database_url)
+    results = asyncio.run(run(args.database_url, dataset, args.filter, args.repeat))
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baselines = json.load(file)
+    regressions = compare(results, baselines, args.threshold)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump({**baselines, **results}, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baselines saved in {args.baseline}")
+    elif regressions:
+        print(
+            f"{len(regressions)} cases slower than the baseline by more than "
+            f"{args.threshold:.0%}: {', '.join(regressions)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
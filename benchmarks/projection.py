@@ -0,0 +1,154 @@
+"""Measure the per-row cost of ORM hydration against column projection.
+
+Reads the same tasks twice: as full Task ORM objects (identity map, instance
+state) validated one by one into TaskRead, as the list reads did, and as
+plain rows of the task columns validated in one pass with task_reads, as
+TaskRepository.list_page and TaskService.list_tasks do now. Each read runs
+in a new session so the identity map starts empty, the best run is kept.
+
+Usage:
+    python -m benchmarks.projection --rows 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.models.task import Task
+from app.db.repositories.task import TASK_COLUMNS
+from app.db.session import get_async_url
+from app.schemas.task import TaskRead
+from app.services.task import task_reads
+from benchmarks.index_plans import seed
+
+
+async def orm_objects(db, rows: int) -> tuple[float, float]:
+    """Read tasks as ORM objects and validate them one by one.
+
+    Args:
+        db (AsyncSession): Database session.
+        rows (int): Number of tasks to read.
+
+    Returns:
+        tuple[float, float]: Seconds to fetch and seconds to build the models.
+    """
+    start = time.perf_counter()
+    result = await db.scalars(select(Task).order_by(Task.id).limit(rows))
+    tasks = list(result)
+    fetched = time.perf_counter()
+    [TaskRead.model_validate(task) for task in tasks]
+    return fetched - start, time.perf_counter() - fetched
+
+
+async def column_rows(db, rows: int) -> tuple[float, float]:
+    """Read tasks as rows of the task columns and validate them in one pass.
+
+    Args:
+        db (AsyncSession): Database session.
+        rows (int): Number of tasks to read.
+
+    Returns:
+        tuple[float, float]: Seconds to fetch and seconds to build the models.
+    """
+    start = time.perf_counter()
+    result = await db.execute(select(*TASK_COLUMNS).order_by(Task.id).limit(rows))
+    tasks = result.all()
+    fetched = time.perf_counter()
+    task_reads(tasks)
+    return fetched - start, time.perf_counter() - fetched
+
+
+async def measure(name: str, read, sessions, rows: int, repeat: int) -> dict:
+    """Run a read repeat times in new sessions and keep the best run.
+
+    Args:
+        name (str): Read name.
+        read: Read coroutine function.
+        sessions (async_sessionmaker): Session factory.
+        rows (int): Number of tasks to read.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: Milliseconds to fetch, to build and in total, and microseconds
+        per row.
+    """
+    best = None
+    for _ in range(repeat):
+        async with sessions() as db:
+            fetch, build = await read(db, rows)
+        if best is None or fetch + build < sum(best):
+            best = (fetch, build)
+    fetch, build = best
+    stats = {
+        "fetch_ms": round(fetch * 1000, 1),
+        "build_ms": round(build * 1000, 1),
+        "total_ms": round((fetch + build) * 1000, 1),
+        "us_per_row": round((fetch + build) / rows * 1e6, 2),
+    }
+    print(
+        f"  {name:<12} fetch {stats['fetch_ms']:>8} ms  "
+        f"build {stats['build_ms']:>8} ms  total {stats['total_ms']:>8} ms  "
+        f"{stats['us_per_row']:>6} us/row"
+    )
+    return stats
+
+
+async def run(database_url: str, rows: int, repeat: int) -> dict:
+    """Measure both reads.
+
+    Args:
+        database_url (str): Database url.
+        rows (int): Number of tasks to read.
+        repeat (int): Runs per read.
+
+    Returns:
+        dict: Stats by read name.
+    """
+    engine = create_async_engine(get_async_url(database_url))
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    results = {
+        "orm": await measure("orm objects", orm_objects, sessions, rows, repeat),
+        "columns": await measure("column rows", column_rows, sessions, rows, repeat),
+    }
+    await engine.dispose()
+    results["saved_us_per_row"] = round(
+        results["orm"]["us_per_row"] - results["columns"]["us_per_row"], 2
+    )
+    print(f"  saved {results['saved_us_per_row']} us/row")
+    return results
+
+
+def main() -> None:
+    """Seed the dataset and print the cost per row of both reads."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=settings.TEST_DATABASE_URL)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=2_000)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results to this json file")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT NOT EXISTS (SELECT 1 FROM tasks)")).scalar():
+            print(f"Seeding {args.tasks} tasks in {args.lists} lists...")
+            seed(conn, args.users, args.lists, args.tasks)
+        rows = min(args.rows, conn.execute(text("SELECT count(*) FROM tasks")).scalar())
+
+    print(f"Reading {rows} tasks:")
+    results = asyncio.run(run(args.database_url, rows, args.repeat))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"rows": rows, **results}, file)
+
+
+if __name__ == "__main__":
+    main()
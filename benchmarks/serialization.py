@@ -0,0 +1,187 @@
+"""Compare the response serialization of the task list endpoints.
+
+The default FastAPI path validates every row into a TaskRead, validates the
+payload again against the response_model, runs jsonable_encoder and encodes
+with json.dumps in JSONResponse. The fast path validates the rows once with
+a precompiled TypeAdapter and dumps them straight to bytes. Both paths run
+in process on rows shaped like the ORM results, so no database is needed.
+
+Usage:
+    python -m benchmarks.serialization --tasks 1000 --lists 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from types import SimpleNamespace
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.enums.general_enums import PriorityEnum, TaskStatusEnum
+from app.core.responses import json_response
+from app.schemas.task import (
+    TaskRead,
+    TaskListRead,
+    TASK_READ_LIST,
+    TASK_LIST_READ_LIST,
+)
+
+TASKS_FIELD = create_model_field("Response_tasks", list[TaskRead], mode="serialization")
+TASK_LISTS_FIELD = create_model_field(
+    "Response_task_lists", list[TaskListRead], mode="serialization"
+)
+
+
+def make_rows(tasks: int, lists: int) -> list[SimpleNamespace]:
+    """Build task rows with the attributes of the ORM results.
+
+    Args:
+        tasks (int): Number of rows.
+        lists (int): Number of task lists the rows belong to.
+
+    Returns:
+        list[SimpleNamespace]: Task rows.
+    """
+    generator = random.Random(0)
+    return [
+        SimpleNamespace(
+            id=task_id,
+            user_id=generator.randint(1, 500),
+            task_list_id=task_id % lists + 1,
+            description=f"Task {task_id} description with a few words",
+            priority=generator.choice(list(PriorityEnum)),
+            status=generator.choice(list(TaskStatusEnum)),
+        )
+        for task_id in range(1, tasks + 1)
+    ]
+
+
+async def default_tasks(rows: list) -> bytes:
+    """Serialize a page of tasks as the default FastAPI path does."""
+    tasks = [TaskRead.model_validate(row) for row in rows]
+    return await encode_default(TASKS_FIELD, tasks)
+
+
+async def fast_tasks(rows: list) -> bytes:
+    """Serialize a page of tasks validating once and dumping to bytes."""
+    tasks = TASK_READ_LIST.validate_python(rows, from_attributes=True)
+    return json_response(TASK_READ_LIST, tasks).body
+
+
+def group(lists: int, tasks: list) -> list[TaskListRead]:
+    """Group validated tasks in their task lists."""
+    by_list = {list_id: [] for list_id in range(1, lists + 1)}
+    for task in tasks:
+        by_list[task.task_list_id].append(task)
+    return [
+        TaskListRead(
+            id=list_id, name=f"List {list_id}", percentage_of_completeness=50.0, tasks=t
+        )
+        for list_id, t in by_list.items()
+    ]
+
+
+async def default_task_lists(rows: list, lists: int) -> bytes:
+    """Serialize all the task lists as the default FastAPI path does."""
+    tasks = [TaskRead.model_validate(row) for row in rows]
+    return await encode_default(TASK_LISTS_FIELD, group(lists, tasks))
+
+
+async def fast_task_lists(rows: list, lists: int) -> bytes:
+    """Serialize all the task lists validating once and dumping to bytes."""
+    tasks = TASK_READ_LIST.validate_python(rows, from_attributes=True)
+    return json_response(TASK_LIST_READ_LIST, group(lists, tasks)).body
+
+
+async def encode_default(field, content) -> bytes:
+    """Run the response_model validation, jsonable_encoder and JSONResponse."""
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+async def timed(serialize, repeat: int) -> float:
+    """Best milliseconds of repeat runs of serialize."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await serialize()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def compare(name: str, default, fast, repeat: int) -> dict:
+    """Check both paths encode the same payload and time them.
+
+    Args:
+        name (str): Payload name.
+        default: Default path coroutine function, returns the body.
+        fast: Fast path coroutine function, returns the body.
+        repeat (int): Runs per path, the best one is reported.
+
+    Returns:
+        dict: Milliseconds of each path and the speedup.
+    """
+    assert json.loads(await default()) == json.loads(await fast()), name
+    stats = {
+        "default_ms": await timed(default, repeat),
+        "fast_ms": await timed(fast, repeat),
+    }
+    stats["speedup"] = round(stats["default_ms"] / stats["fast_ms"], 2)
+    stats["default_ms"] = round(stats["default_ms"], 3)
+    stats["fast_ms"] = round(stats["fast_ms"], 3)
+    print(
+        f"  {name:<14} default {stats['default_ms']:>9.3f} ms  "
+        f"fast {stats['fast_ms']:>9.3f} ms  x{stats['speedup']}"
+    )
+    return stats
+
+
+async def run(rows: list, lists: int, repeat: int) -> dict:
+    """Compare both paths for each endpoint payload.
+
+    Args:
+        rows (list): Task rows.
+        lists (int): Number of task lists.
+        repeat (int): Runs per path.
+
+    Returns:
+        dict: Stats by payload name.
+    """
+    return {
+        "tasks": await compare(
+            "GET /tasks/",
+            lambda: default_tasks(rows),
+            lambda: fast_tasks(rows),
+            repeat,
+        ),
+        "task_lists": await compare(
+            "GET /task-list",
+            lambda: default_task_lists(rows, lists),
+            lambda: fast_task_lists(rows, lists),
+            repeat,
+        ),
+    }
+
+
+def main() -> None:
+    """Print the serialization time of both paths for each endpoint payload."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000)
+    parser.add_argument("--lists", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the results to this json file")
+    args = parser.parse_args()
+
+    rows = make_rows(args.tasks, args.lists)
+    print(f"Serializing {args.tasks} tasks in {args.lists} lists:")
+    results = asyncio.run(run(rows, args.lists, args.repeat))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"tasks": args.tasks, "lists": args.lists, **results}, file)
+
+
+if __name__ == "__main__":
+    main()
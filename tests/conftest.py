@@ -1,16 +1,42 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.db.base import Base
 from app.main import app
 from fastapi.testclient import TestClient
-from app.db.session import get_db
+from app.db.session import (
+    get_db,
+    get_async_db,
+    get_async_url,
+    get_read_db,
+    get_read_sessions,
+    recent_writers,
+)
+from app.core.request_metrics import instrument_engine
 from app.core.settings import settings
+from app.db.slow_queries import slow_query_log
+from app.core.cache import principal_cache
+
+# Tests drive the notification dispatcher themselves, see test_task_routes.
+settings.NOTIFICATION_DISPATCHER_ENABLED = False
 
 
 engine = create_engine(settings.TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Every TestClient runs its own event loop, asyncpg connections can not be
+# shared between loops, so the async engine does not pool them.
+async_engine = create_async_engine(
+    get_async_url(settings.TEST_DATABASE_URL), poolclass=NullPool
+)
+instrument_engine(async_engine.sync_engine)
+slow_query_log.watch(async_engine.sync_engine, async_engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def override_get_db():
     """Override get_db dependency."""
@@ -21,11 +47,29 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override get_async_db dependency."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+def override_get_read_sessions():
+    """Override get_read_sessions dependency."""
+
+    async def open_session():
+        return TestingAsyncSessionLocal()
+
+    return open_session
+
+
 @pytest.fixture(scope="session", autouse=True)
 def prepare_database():
     """Create test database."""
     Base.metadata.create_all(bind=engine)
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    app.dependency_overrides[get_read_sessions] = override_get_read_sessions
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -47,6 +91,8 @@ def clean_tables():
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(text(f"TRUNCATE TABLE {table.name} RESTART IDENTITY CASCADE;"))
         trans.commit()
+    principal_cache.clear()
+    recent_writers.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,48 @@
+import pytest
+from app.core.settings import settings
+from app.db.slow_queries import slow_query_log
+
+
+@pytest.mark.integration
+def test_slow_queries_requires_admin(client, header_user_token):
+    """Test only the users in ADMIN_EMAILS see the slow query log."""
+
+    response = client.get("/admin/slow-queries", headers=header_user_token)
+    assert response.status_code == 403
+
+
+@pytest.mark.integration
+def test_slow_queries_capture_plans(client, header_user_token, monkeypatch):
+    """Test slow statements are listed by fingerprint with their plan."""
+
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["user@example.com"])
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+    monkeypatch.setattr(slow_query_log, "explain_rate", 1.0)
+    slow_query_log.clear()
+
+    response = client.post(
+        "tasks/task-list", headers=header_user_token, json={"name": "slow list"}
+    )
+    task_list_id = response.json()["id"]
+    for _ in range(2):
+        client.get(f"tasks/task-list/{task_list_id}", headers=header_user_token)
+    client.portal.call(slow_query_log.wait_explains)
+
+    response = client.get(
+        "/admin/slow-queries",
+        headers=header_user_token,
+        params={"limit": 100, "order": "total"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    totals = [item["total_ms"] for item in data]
+    assert totals == sorted(totals, reverse=True)
+
+    selects = [item for item in data if "FROM task_lists" in item["statement"]]
+    assert selects and all("?" in item["statement"] for item in selects)
+    assert any(item["count"] >= 2 for item in selects)
+    plans = [item["plan"] for item in data if item["plan"]]
+    assert plans and all("actual time" in plan for plan in plans)
+    assert not any(
+        item["plan"] for item in data if item["statement"].startswith("INSERT")
+    )
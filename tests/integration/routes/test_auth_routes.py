@@ -82,3 +82,75 @@ def test_invalid_credentials_user(client):
     )
 
     assert response.status_code == 400
+
+
+@pytest.mark.integration
+def test_current_user_is_cached(client, header_user_token):
+    """Test the authenticated user is read from the cache after first request."""
+    from app.core.cache import principal_cache
+
+    client.get("/tasks/", headers=header_user_token)
+    hits = principal_cache.hits
+    client.get("/tasks/", headers=header_user_token)
+    assert principal_cache.hits == hits + 1
+
+    response = client.get("/tasks/", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+def test_tokens_without_valid_claims_are_rejected(client, header_user_token):
+    """Test signed tokens without exp or with a non string sub return 401."""
+    from datetime import datetime, timedelta
+    from jose import jwt
+    from app.core.settings import settings
+
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    for claims in ({"sub": "1"}, {"sub": 1, "exp": expires_at}, {"exp": expires_at}):
+        token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        response = client.get("/tasks/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+
+@pytest.mark.integration
+def test_login_rehashes_outdated_password(client):
+    """Test login rehashes passwords hashed with another work factor."""
+    from passlib.hash import bcrypt
+    from sqlalchemy import text
+    from app.core.settings import settings
+    from tests.conftest import engine
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (full_name, email, password) "
+                "VALUES ('Old User', 'old@example.com', :password)"
+            ),
+            {"password": bcrypt.using(rounds=4).hash("123456")},
+        )
+
+    response = client.post(
+        "/auth/login", json={"email": "old@example.com", "password": "123456"}
+    )
+    assert response.status_code == 200
+
+    with engine.connect() as conn:
+        password = conn.execute(
+            text("SELECT password FROM users WHERE email = 'old@example.com'")
+        ).scalar()
+    assert password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+
+@pytest.mark.integration
+def test_metrics_endpoint(client, header_user_token):
+    """Test pool, cache and password hashing metrics are exported."""
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'db_pool_size{engine="primary"} 10.0' in body
+    assert 'db_pool_checked_out{engine="primary"}' in body
+    assert "# TYPE db_pool_checkout_seconds histogram" in body
+    assert "password_hash_completed_total" in body
+    assert "principal_cache_misses_total" in body
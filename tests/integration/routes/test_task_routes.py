@@ -1,4 +1,15 @@
+import csv
+import io
+import json
 import pytest
+from sqlalchemy import text
+from app.db.session import recent_writers
+from app.core.settings import settings
+from app.services.notification import FakeSender, NotificationDispatcher
+from app.schemas.task import TaskImportResult
+from app.services.task import TaskListService
+from app.services.task_import import TaskImportService
+from tests.conftest import TestingAsyncSessionLocal, engine
 
 
 @pytest.mark.integration
@@ -297,3 +308,716 @@ def test_get_task_list(client, header_user_token):
     assert response.status_code == 200
     data = response.json()
     assert data["percentage_of_completeness"] == 50
+
+
+@pytest.mark.integration
+def test_list_tasks_pagination(client, header_user_token):
+    """Test list task route walking pages with the next cursor."""
+    payload = {
+        "task_list": {"name": "Test Task List Pagination"},
+        "tasks": [
+            {"description": f"page task {i}", "priority": "low"} for i in range(5)
+        ],
+    }
+
+    client.post("tasks/task-list-with-tasks", headers=header_user_token, json=payload)
+
+    response = client.get("/tasks/?limit=2", headers=header_user_token)
+    assert response.status_code == 200
+    descriptions = [t["description"] for t in response.json()]
+
+    while "X-Next-Cursor" in response.headers:
+        response = client.get(
+            f"/tasks/?limit=2&after={response.headers["X-Next-Cursor"]}",
+            headers=header_user_token,
+        )
+        assert response.status_code == 200
+        descriptions += [t["description"] for t in response.json()]
+
+    assert descriptions == [f"page task {i}" for i in range(5)]
+
+    response = client.get("/tasks/?after=invalid", headers=header_user_token)
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+def test_list_tasks_filters(client, header_user_token):
+    """Test list task route with filters."""
+    payload = {
+        "task_list": {"name": "Test Task List Filters"},
+        "tasks": [
+            {"description": "filter task 1", "priority": "low"},
+            {"description": "filter task 2", "priority": "high"},
+            {"description": "filter task 3", "priority": "high", "status": "completed"},
+        ],
+    }
+
+    response = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    )
+    task_list_id = response.json()["id"]
+
+    response = client.get(
+        f"/tasks/?priority=high&status=pending&task_list_id={task_list_id}",
+        headers=header_user_token,
+    )
+
+    assert response.status_code == 200
+    assert [t["description"] for t in response.json()] == ["filter task 2"]
+
+
+@pytest.mark.integration
+def test_list_all_task_list_completeness(client, header_user_token):
+    """Test list all task lists returns each list with its tasks and completeness"""
+
+    payload_a = {
+        "task_list": {"name": "Completeness List 1"},
+        "tasks": [
+            {"description": "list task 1", "priority": "low", "status": "completed"},
+            {"description": "list task 2", "priority": "high"},
+            {"description": "list task 3", "priority": "high"},
+            {"description": "list task 4", "priority": "high"},
+        ],
+    }
+    payload_b = {"task_list": {"name": "Completeness List 2"}, "tasks": []}
+
+    client.post("tasks/task-list-with-tasks", headers=header_user_token, json=payload_a)
+    client.post("tasks/task-list-with-tasks", headers=header_user_token, json=payload_b)
+
+    response = client.get("tasks/task-list", headers=header_user_token)
+    assert response.status_code == 200
+    data = {t["name"]: t for t in response.json()}
+
+    assert data["Completeness List 1"]["percentage_of_completeness"] == 25
+    assert len(data["Completeness List 1"]["tasks"]) == 4
+    assert data["Completeness List 2"]["percentage_of_completeness"] == 0
+    assert data["Completeness List 2"]["tasks"] == []
+
+
+@pytest.mark.integration
+def test_get_task_list_filters_and_pagination(client, header_user_token):
+    """Test get task list route with filters and paginated tasks"""
+
+    payload = {
+        "task_list": {"name": "Test get Task List filters"},
+        "tasks": [
+            {"description": "list task 1", "priority": "low", "status": "completed"},
+            {"description": "list task 2", "priority": "high"},
+            {"description": "list task 3", "priority": "high"},
+            {"description": "list task 4", "priority": "high"},
+        ],
+    }
+
+    response = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    )
+    task_list_id = response.json()["id"]
+
+    response = client.get(
+        f"tasks/task-list/{task_list_id}?priority=high&limit=2",
+        headers=header_user_token,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["percentage_of_completeness"] == 25
+    assert [t["description"] for t in data["tasks"]] == ["list task 2", "list task 3"]
+
+    response = client.get(
+        f"tasks/task-list/{task_list_id}?priority=high&limit=2"
+        f"&after={response.headers["X-Next-Cursor"]}",
+        headers=header_user_token,
+    )
+    assert [t["description"] for t in response.json()["tasks"]] == ["list task 4"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("tasks/task-list/123456", headers=header_user_token)
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+def test_create_task_list_with_many_tasks(client, header_user_token):
+    """Test creating a task list with many tasks in a single transaction."""
+
+    payload = {
+        "task_list": {"name": "Test Bulk Task List"},
+        "tasks": [
+            {
+                "description": f"bulk task {i}",
+                "priority": "medium",
+                "status": "completed" if i % 4 == 0 else "pending",
+            }
+            for i in range(500)
+        ],
+    }
+
+    response = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["description"] for t in data["tasks"]] == [
+        f"bulk task {i}" for i in range(500)
+    ]
+    assert data["percentage_of_completeness"] == 25
+
+    response = client.get(f"tasks/task-list/{data["id"]}", headers=header_user_token)
+    assert len(response.json()["tasks"]) == 500
+
+
+@pytest.mark.integration
+def test_bulk_task_mutations(client, header_user_token):
+    """Test bulk create, status, in charge and delete routes."""
+
+    response = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "bulk list"}
+    )
+    task_list_id = response.json()["id"]
+
+    response = client.post(
+        "tasks/bulk",
+        headers=header_user_token,
+        json={
+            "tasks": [
+                {
+                    "task_list_id": task_list_id,
+                    "description": f"bulk task {i}",
+                    "priority": "low",
+                }
+                for i in range(3)
+            ]
+        },
+    )
+    assert response.status_code == 200
+    ids = [t["id"] for t in response.json()["tasks"]]
+    assert len(ids) == 3
+
+    response = client.patch(
+        "tasks/bulk/status",
+        headers=header_user_token,
+        json={"ids": ids + [123456], "status": "completed"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert {t["status"] for t in data["tasks"]} == {"completed"}
+    assert data["missing_ids"] == [123456]
+
+    response = client.post(
+        "/auth/register",
+        json={
+            "email": "bulk_in_charge@example.com",
+            "password": "123456",
+            "full_name": "Test User",
+        },
+    )
+    user_id = response.json()["id"]
+    response = client.patch(
+        "tasks/bulk/in-charge",
+        headers=header_user_token,
+        json={"filters": {"task_list_id": task_list_id}, "user_id": user_id},
+    )
+    assert response.status_code == 200
+    assert {t["user_id"] for t in response.json()["tasks"]} == {user_id}
+
+    response = client.post(
+        "tasks/bulk/delete", headers=header_user_token, json={"filters": {}}
+    )
+    assert response.status_code == 422
+    for ids_selection in ([2**31], [0]):
+        response = client.post(
+            "tasks/bulk/delete",
+            headers=header_user_token,
+            json={"ids": ids_selection},
+        )
+        assert response.status_code == 422
+
+    response = client.post(
+        "tasks/bulk/delete",
+        headers=header_user_token,
+        json={"ids": [ids[0], 123456]},
+    )
+    assert response.json() == {"deleted_ids": [ids[0]], "missing_ids": [123456]}
+
+    response = client.get(
+        f"tasks/?task_list_id={task_list_id}", headers=header_user_token
+    )
+    assert [t["id"] for t in response.json()] == ids[1:]
+
+
+@pytest.mark.integration
+def test_write_pins_reads_to_primary(client, header_user_token):
+    """Test a committed write pins the user reads to the primary."""
+
+    client.get("tasks/task-list", headers=header_user_token)
+    assert recent_writers.get("1") is None
+
+    client.post("tasks/task-list/", headers=header_user_token, json={"name": "pinned"})
+    assert recent_writers.get("1") is True
+
+
+@pytest.mark.integration
+def test_conditional_get_task_and_task_list(client, header_user_token):
+    """Test ETags change with the row versions and 304 is answered."""
+
+    task_list = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "etag"}
+    ).json()
+    task = client.post(
+        "tasks/",
+        headers=header_user_token,
+        json={
+            "user_id": 1,
+            "task_list_id": task_list["id"],
+            "description": "etag task",
+            "priority": "low",
+        },
+    ).json()
+    task_url = f"tasks/{task['id']}"
+    list_url = f"tasks/task-list/{task_list['id']}"
+
+    response = client.get(task_url, headers=header_user_token)
+    task_etag = response.headers["ETag"]
+    response = client.get(list_url, headers=header_user_token)
+    list_etag = response.headers["ETag"]
+
+    for url, etag in ((task_url, task_etag), (list_url, list_etag)):
+        response = client.get(url, headers={**header_user_token, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    response = client.get(
+        f"{list_url}?status=pending",
+        headers={**header_user_token, "If-None-Match": list_etag},
+    )
+    assert response.status_code == 200
+
+    client.patch(
+        f"tasks/update-status/{task['id']}",
+        headers=header_user_token,
+        json={"status": "completed"},
+    )
+    for url, etag in ((task_url, task_etag), (list_url, list_etag)):
+        response = client.get(url, headers={**header_user_token, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    response = client.get("tasks/999999", headers=header_user_token)
+    assert response.status_code == 400
+
+
+def assert_counters_match_tasks():
+    """Assert the task counters of every list match its tasks."""
+    with engine.connect() as conn:
+        drifted = conn.execute(
+            text(
+                "SELECT task_lists.id FROM task_lists "
+                "LEFT JOIN tasks ON tasks.task_list_id = task_lists.id "
+                "GROUP BY task_lists.id HAVING total_tasks <> count(tasks.id) "
+                "OR completed_tasks <> count(tasks.id) "
+                "FILTER (WHERE tasks.status = 'COMPLETED')"
+            )
+        ).all()
+    assert drifted == []
+
+
+@pytest.mark.integration
+def test_task_list_counters_follow_task_changes(client, header_user_token):
+    """Test create, update, move, bulk and delete paths keep counters exact."""
+
+    payload = {
+        "task_list": {"name": "counted"},
+        "tasks": [
+            {"user_id": 1, "description": f"t{i}", "priority": "low"} for i in range(4)
+        ],
+    }
+    first = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    ).json()
+    second = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "other"}
+    ).json()
+    ids = [t["id"] for t in first["tasks"]]
+    assert_counters_match_tasks()
+
+    client.patch(
+        "tasks/bulk/status",
+        headers=header_user_token,
+        json={"ids": ids[:3], "status": "completed"},
+    )
+    client.patch(
+        f"tasks/update-status/{ids[3]}",
+        headers=header_user_token,
+        json={"status": "completed"},
+    )
+    client.put(
+        f"tasks/{ids[0]}",
+        headers=header_user_token,
+        json={"task_list_id": second["id"]},
+    )
+    client.delete(f"tasks/{ids[1]}", headers=header_user_token)
+    client.post("tasks/bulk/delete", headers=header_user_token, json={"ids": [ids[2]]})
+    client.post(
+        "tasks/",
+        headers=header_user_token,
+        json={
+            "user_id": 1,
+            "task_list_id": second["id"],
+            "description": "new",
+            "priority": "low",
+        },
+    )
+    assert_counters_match_tasks()
+
+    response = client.get(f"tasks/task-list/{second['id']}", headers=header_user_token)
+    assert response.json()["percentage_of_completeness"] == 50.0
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_reconcile_counters_repairs_drift(client, header_user_token):
+    """Test the reconciliation job repairs only drifted lists."""
+
+    for name in ("a", "b", "c"):
+        client.post("tasks/task-list/", headers=header_user_token, json={"name": name})
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE task_lists SET total_tasks = 5 WHERE id = 2"))
+
+    async with TestingAsyncSessionLocal() as db:
+        repaired = await TaskListService(db).reconcile_counters(batch_size=2)
+
+    assert repaired == [2]
+    assert_counters_match_tasks()
+
+
+@pytest.mark.integration
+def test_export_tasks(client, header_user_token):
+    """Test tasks are exported as NDJSON and CSV with filters."""
+
+    payload = {
+        "task_list": {"name": "export"},
+        "tasks": [
+            {"user_id": 1, "description": f"task, {i}", "priority": "high"}
+            for i in range(1500)
+        ],
+    }
+    task_list = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    ).json()
+    client.post("tasks/task-list/", headers=header_user_token, json={"name": "empty"})
+    queries = 'http_request_db_queries_sum{method="GET",route="/tasks/export"}'
+    before = metric_value(client.get("/metrics").text, queries)
+
+    response = client.get(
+        f"tasks/export?task_list_id={task_list['id']}", headers=header_user_token
+    )
+    assert response.status_code == 200
+    # The streamed reads run in the request and are counted in its metrics.
+    assert metric_value(client.get("/metrics").text, queries) > before
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 1500
+    assert lines[0] == {
+        "id": task_list["tasks"][0]["id"],
+        "user_id": 1,
+        "task_list_id": task_list["id"],
+        "description": "task, 0",
+        "status": "pending",
+        "priority": "high",
+    }
+
+    response = client.get(
+        "tasks/export?format=csv&status=completed", headers=header_user_token
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "id,user_id,task_list_id,description,status,priority"
+    ]
+
+    response = client.get("tasks/export?format=csv", headers=header_user_token)
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert len(rows) == 1501
+    assert rows[1][3:] == ["task, 0", "pending", "high"]
+
+
+@pytest.mark.integration
+def test_import_tasks(client, header_user_token):
+    """Test CSV and NDJSON imports load valid rows and report the others."""
+
+    task_list = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "import"}
+    ).json()
+    list_id = task_list["id"]
+    body = (
+        "id,description,priority,status,task_list_id,user_id\n"
+        f'9,"multi\nline, task",high,completed,{list_id},\n'
+        f"10,plain,low,,{list_id},1\n"
+        f"11,bad priority,urgent,,{list_id},\n"
+        "12,no list,low,,999999,\n"
+        f"13,no user,low,,{list_id},888888\n"
+    )
+    response = client.post(
+        "tasks/import?format=csv", headers=header_user_token, content=body
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["failed"] == 3
+    assert [error["line"] for error in data["errors"]] == [5, 6, 7]
+    assert data["errors"][0]["error"].startswith("priority:")
+    assert data["errors"][1]["error"] == "Task list 999999 does not exist"
+    assert data["errors"][2]["error"] == "User 888888 does not exist"
+
+    lines = [
+        json.dumps({"description": f"json {i}", "priority": "medium"}) for i in range(3)
+    ]
+    body = "\n".join([*lines, "not json", "", "[1]"]).encode()
+    response = client.post(
+        "tasks/import?format=ndjson", headers=header_user_token, content=body
+    )
+    data = response.json()
+    assert data["imported"] == 3
+    assert [error["line"] for error in data["errors"]] == [4, 6]
+
+    response = client.get(f"tasks/task-list/{list_id}", headers=header_user_token)
+    tasks = response.json()["tasks"]
+    assert [(t["description"], t["status"], t["user_id"]) for t in tasks] == [
+        ("multi\nline, task", "completed", 1),
+        ("plain", "pending", 1),
+    ]
+    assert response.json()["percentage_of_completeness"] == 50.0
+    assert_counters_match_tasks()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_import_reports_rows_postgres_rejects(client, header_user_token):
+    """Test NUL characters are rejected per row and COPY errors per batch."""
+
+    body = "\n".join(
+        json.dumps({"description": description, "priority": "low"})
+        for description in ("before", "nul \u0000 char", "after")
+    ).encode()
+    response = client.post(
+        "tasks/import?format=ndjson", headers=header_user_token, content=body
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert [error["line"] for error in data["errors"]] == [2]
+    assert "NUL characters" in data["errors"][0]["error"]
+
+    result = TaskImportResult(imported=0, failed=0)
+    async with TestingAsyncSessionLocal() as db:
+        service = TaskImportService(db)
+        await service.load(
+            [
+                (1, 1, None, "valid", "PENDING", "LOW"),
+                (2, 1, None, "\x00", "LOW", "LOW"),
+            ],
+            result,
+        )
+        await service.load([(3, 1, None, "next batch", "PENDING", "LOW")], result)
+    assert result.imported == 1
+    assert [error.line for error in result.errors] == [1, 2]
+    assert result.errors[0].error.startswith("Batch rejected:")
+    assert_counters_match_tasks()
+
+
+@pytest.mark.integration
+def test_search_tasks(client, header_user_token):
+    """Test ranked prefix search with filters and keyset pagination."""
+
+    descriptions = [
+        "fix login bug",
+        "fix login bug, login fails twice",
+        "write docs",
+        "logging cleanup",
+        "Fix the login page",
+    ]
+    payload = {
+        "task_list": {"name": "search"},
+        "tasks": [
+            {"user_id": 1, "description": description, "priority": "low"}
+            for description in descriptions
+        ],
+    }
+    tasks = client.post(
+        "tasks/task-list-with-tasks", headers=header_user_token, json=payload
+    ).json()["tasks"]
+    ids = [task["id"] for task in tasks]
+    client.patch(
+        f"tasks/update-status/{ids[4]}",
+        headers=header_user_token,
+        json={"status": "completed"},
+    )
+
+    response = client.get("tasks/search?q=log", headers=header_user_token)
+    assert response.status_code == 200
+    found = [task["id"] for task in response.json()]
+    assert found[0] == ids[1]
+    assert sorted(found) == [ids[0], ids[1], ids[3], ids[4]]
+
+    response = client.get(
+        "tasks/search?q=FIX log&status=pending", headers=header_user_token
+    )
+    assert [task["id"] for task in response.json()] == [ids[0], ids[1]]
+
+    pages, url = [], "tasks/search?q=login&limit=1"
+    while url:
+        response = client.get(url, headers=header_user_token)
+        pages.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        url = cursor and f"tasks/search?q=login&limit=1&after={cursor}"
+    assert pages[0] == ids[1]
+    assert sorted(pages) == [ids[0], ids[1], ids[4]]
+
+    response = client.get("tasks/search?q=!!", headers=header_user_token)
+    assert response.json() == []
+    response = client.get("tasks/search?q=fix&after=bad", headers=header_user_token)
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_assignment_notifications_outbox(client, header_user_token, monkeypatch):
+    """Test assignments are queued with dedup and sent with retries."""
+
+    user_id = client.post(
+        "/auth/register",
+        json={"email": "outbox@example.com", "password": "123456", "full_name": "O"},
+    ).json()["id"]
+    task_list = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "outbox"}
+    ).json()
+    task = client.post(
+        "tasks/",
+        headers=header_user_token,
+        json={"task_list_id": task_list["id"], "description": "d", "priority": "low"},
+    ).json()
+    url = f"tasks/update-in-charge/{task['id']}"
+    for assignee in (user_id, user_id, 1, user_id):
+        client.patch(url, headers=header_user_token, json={"user_id": assignee})
+    client.patch(
+        "tasks/bulk/in-charge",
+        headers=header_user_token,
+        json={"ids": [task["id"]], "user_id": 1},
+    )
+
+    with engine.connect() as conn:
+        queued = conn.execute(
+            text("SELECT dedup_key FROM notification_outbox ORDER BY id")
+        ).scalars()
+        assert list(queued) == [
+            f"task_assignment:{task['id']}:{user_id}",
+            f"task_assignment:{task['id']}:1",
+        ]
+
+    monkeypatch.setattr(settings, "NOTIFICATION_BACKOFF_SECONDS", 0)
+    sender = FakeSender(failures=1)
+    dispatcher = NotificationDispatcher(TestingAsyncSessionLocal, sender)
+    assert await dispatcher.dispatch_once() == 2
+    assert [message.payload for message in sender.sent] == [
+        {"user_id": 1, "task_id": task["id"]}
+    ]
+    assert await dispatcher.dispatch_once() == 1
+    assert sender.sent[1].payload["user_id"] == user_id
+    assert sender.sent[1].attempts == 2
+    assert await dispatcher.dispatch_once() == 0
+
+    client.patch(url, headers=header_user_token, json={"user_id": user_id})
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 1)
+    await NotificationDispatcher(
+        TestingAsyncSessionLocal, FakeSender(1)
+    ).dispatch_once()
+    with engine.connect() as conn:
+        statuses = conn.execute(
+            text("SELECT status FROM notification_outbox ORDER BY id")
+        ).scalars()
+        assert list(statuses) == ["SENT", "SENT", "FAILED"]
+
+
+def metric_value(body: str, sample: str) -> float:
+    """Get the value of a sample from a Prometheus text exposition, 0 if absent."""
+    for line in body.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.integration
+def test_request_metrics_per_route(client, header_user_token):
+    """Test latency, status and database work are exported per route template."""
+
+    client.post(
+        "tasks/task-list-with-tasks",
+        headers=header_user_token,
+        json={
+            "task_list": {"name": "metrics list"},
+            "tasks": [{"description": "task", "priority": "low"}] * 3,
+        },
+    )
+    labels = '{method="GET",route="/tasks/task-list"}'
+    before = client.get("/metrics").text
+
+    response = client.get("tasks/task-list", headers=header_user_token)
+    assert response.status_code == 200
+    response = client.get("tasks/999999", headers=header_user_token)
+    assert response.status_code == 400
+
+    body = client.get("/metrics").text
+    for sample, delta in (
+        (f"http_request_duration_seconds_count{labels}", 1),
+        (f"http_request_db_queries_count{labels}", 1),
+        # Lists with completeness and their tasks, the user comes from cache.
+        (f"http_request_db_queries_sum{labels}", 2),
+        (
+            'http_requests_total{method="GET",route="/tasks/{task_id}",status="400"}',
+            1,
+        ),
+    ):
+        assert metric_value(body, sample) - metric_value(before, sample) == delta
+    assert metric_value(body, f"http_request_db_seconds_sum{labels}") > 0
+    assert 'route="/tasks/999999"' not in body
+
+
+@pytest.mark.integration
+def test_single_task_writes_in_one_statement(client, header_user_token):
+    """Test update and delete of a task run one statement plus the counters."""
+
+    task_list = client.post(
+        "tasks/task-list/", headers=header_user_token, json={"name": "one statement"}
+    ).json()
+    task = client.post(
+        "tasks/",
+        headers=header_user_token,
+        json={
+            "task_list_id": task_list["id"],
+            "description": "one statement task",
+            "priority": "low",
+        },
+    ).json()
+    put = '{method="PUT",route="/tasks/{task_id}"}'
+    delete = '{method="DELETE",route="/tasks/{task_id}"}'
+    before = client.get("/metrics").text
+
+    response = client.put(
+        f"tasks/{task['id']}", headers=header_user_token, json={"status": "completed"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    response = client.put("tasks/999999", headers=header_user_token, json={})
+    assert response.status_code == 400
+    response = client.delete(f"tasks/{task['id']}", headers=header_user_token)
+    assert response.status_code == 200
+
+    body = client.get("/metrics").text
+    # UPDATE/DELETE ... RETURNING and the task list counters, the missing task
+    # returns no row and updates no counters.
+    for sample, delta in (
+        (f"http_request_db_queries_count{put}", 2),
+        (f"http_request_db_queries_sum{put}", 3),
+        (f"http_request_db_queries_sum{delete}", 2),
+    ):
+        assert metric_value(body, sample) - metric_value(before, sample) == delta
+    assert_counters_match_tasks()
@@ -0,0 +1,41 @@
+import pytest
+from app.core.cache import TTLCache
+
+
+@pytest.mark.unit
+def test_cache_evicts_least_recently_used():
+    """Test the cache keeps at most max_size entries."""
+
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1}
+
+
+@pytest.mark.unit
+def test_cache_expiration_and_invalidation(monkeypatch):
+    """Test entries expire after their ttl and can be invalidated."""
+
+    now = 1000.0
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now)
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=600)
+    cache.set("other", 3)
+
+    now += 30
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+    now += 31
+    assert cache.get("long") is None
+
+    cache.set("other", 3)
+    cache.invalidate("other")
+    assert cache.get("other") is None
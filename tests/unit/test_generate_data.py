@@ -0,0 +1,29 @@
+from collections import Counter
+import pytest
+from app.cli.generate_data import build_plan, task_list_records, task_records
+
+
+@pytest.mark.unit
+def test_generated_rows_depend_only_on_seed_and_chunk():
+    """Test a chunk gives the same rows every time and other seeds differ."""
+
+    plan = build_plan(7, users=50, lists=200, exponent=1.1, password="password")
+    again = build_plan(7, users=50, lists=200, exponent=1.1, password="password")
+    other = build_plan(8, users=50, lists=200, exponent=1.1, password="password")
+
+    assert task_records(plan, 1_001, 2_001) == task_records(again, 1_001, 2_001)
+    assert task_list_records(plan, 1, 201) == task_list_records(again, 1, 201)
+    assert task_records(plan, 1, 1_001) != task_records(other, 1, 1_001)
+
+
+@pytest.mark.unit
+def test_task_list_sizes_are_skewed():
+    """Test a few lists hold most tasks and the rows reference existing ids."""
+
+    plan = build_plan(0, users=50, lists=200, exponent=1.1, password="password")
+    tasks = task_records(plan, 1, 10_001)
+    sizes = Counter(task_list_id for _, _, task_list_id, _, _, _ in tasks)
+
+    assert [task[0] for task in tasks] == list(range(1, 10_001))
+    assert all(1 <= task[1] <= 50 and 1 <= task[2] <= 200 for task in tasks)
+    assert sum(size for _, size in sizes.most_common(20)) > len(tasks) / 2
@@ -0,0 +1,48 @@
+import pytest
+from app.core.metrics import Counter, Histogram
+from app.core.settings import settings
+from app.db.session import engine_options
+
+
+@pytest.mark.unit
+def test_metrics_render_prometheus_text():
+    """Test counters and cumulative histogram buckets are rendered."""
+
+    counter = Counter("requests_total", "Requests.", labelnames=("route",))
+    counter.inc(route="/tasks")
+    counter.inc(2, route="/tasks")
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3)
+
+    assert counter.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/tasks"} 3.0',
+    ]
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 2.0',
+        'latency_seconds_bucket{le="+Inf"} 3.0',
+        "latency_seconds_sum 3.55",
+        "latency_seconds_count 3.0",
+    ]
+
+
+@pytest.mark.unit
+def test_engine_options_pgbouncer_mode(monkeypatch):
+    """Test PgBouncer mode disables asyncpg prepared statement caches."""
+
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert engine_options(True, "primary")["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+    connect_args = engine_options(True, "primary")["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != (
+        connect_args["prepared_statement_name_func"]()
+    )
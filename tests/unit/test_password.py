@@ -0,0 +1,45 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from app.core.settings import settings
+from app.exceptions import PasswordHashingBusy
+from app.services import password
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced(monkeypatch):
+    """Test a dead hashing worker does not break the next operations."""
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    password.shutdown_executor()
+    broken = password.get_executor()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    try:
+        hashed = await password.get_password_hash("secret")
+        assert password._executor is not broken
+        assert await password.verify_password("secret", hashed)
+    finally:
+        password.shutdown_executor()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_only_successful_operations_count_as_completed(monkeypatch):
+    """Test failed and rejected operations are not counted as completed."""
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    stats = password.password_pool_stats()
+
+    with pytest.raises(ValueError):
+        await password.verify_password("secret", "not-a-hash")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    with pytest.raises(PasswordHashingBusy):
+        await password.get_password_hash("secret")
+
+    after = password.password_pool_stats()
+    assert after["completed"] == stats["completed"]
+    assert after["failed"] == stats["failed"] + 1
+    assert after["rejected"] == stats["rejected"] + 1
@@ -0,0 +1,53 @@
+import pytest
+from app.db.slow_queries import SlowQueryLog, fingerprint, is_explainable, normalize
+
+
+@pytest.mark.unit
+def test_normalize_groups_statements_by_shape():
+    """Test parameters, literals, IN lists and VALUES rows do not change it."""
+
+    first = normalize(
+        "SELECT tasks.id FROM tasks\nWHERE tasks.id IN ($1::INTEGER, $2::INTEGER)"
+        " AND tasks.description = 'it''s' LIMIT 10"
+    )
+    second = normalize(
+        "SELECT tasks.id FROM tasks WHERE tasks.id IN (%(id_1)s)"
+        " AND tasks.description = 'other' LIMIT 20"
+    )
+    assert first == second
+    assert first == (
+        "SELECT tasks.id FROM tasks WHERE tasks.id IN (...)"
+        " AND tasks.description = ? LIMIT ?"
+    )
+    assert normalize("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)") == (
+        "INSERT INTO t (a, b) VALUES (...)"
+    )
+    assert fingerprint(first) == fingerprint(second)
+
+
+@pytest.mark.unit
+def test_only_read_statements_are_explained():
+    """Test writes and row locks are never run again by EXPLAIN ANALYZE."""
+
+    assert is_explainable("SELECT 1")
+    assert is_explainable("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_explainable("UPDATE tasks SET status = $1")
+    assert not is_explainable("WITH t AS (DELETE FROM tasks RETURNING id) SELECT 1")
+    assert not is_explainable("SELECT id FROM tasks FOR UPDATE SKIP LOCKED")
+
+
+@pytest.mark.unit
+def test_top_aggregates_by_fingerprint():
+    """Test the slowest fingerprints are sorted by the requested duration."""
+
+    log = SlowQueryLog(threshold_ms=0, explain_rate=0, size=3)
+    log.record("SELECT 1", (), 10, None)
+    log.record("SELECT 2", (), 30, None)
+    log.record("SELECT a FROM t", (), 25, None)
+    log.record("SELECT a FROM t", (), 25, None)
+
+    assert len(log.entries) == 3
+    top = log.top(limit=2, order="total")
+    assert [item["statement"] for item in top] == ["SELECT a FROM t", "SELECT ?"]
+    assert top[0]["count"] == 2 and top[0]["mean_ms"] == 25
+    assert [item["max_ms"] for item in log.top(order="max")] == [30, 25]